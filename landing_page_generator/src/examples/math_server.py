@@ -3,80 +3,279 @@ Simple Math MCP Server Example
 
 This is a basic implementation of a math server that handles basic arithmetic operations.
 To use this with the MCP client, run this script and point your MCP tool to it.
+
+Requests are processed concurrently: every request line is handled in its own
+task, and the response carries the request's "id" (if it had one), so
+responses may come back in any order. Plain arithmetic is evaluated exactly
+without sympy, everything else is handed to sympy in a pool of worker
+processes, and results are kept in an LRU cache. It doubles as the reference
+local server for load tests.
+
+Environment variables:
+    MATH_CACHE_SIZE: Number of evaluated expressions to keep (default 4096)
+    MATH_WORKERS: Number of sympy worker processes (default: number of CPUs)
+    MATH_MAX_IN_FLIGHT: Requests processed at once (default 256)
 """
 
+import ast
 import asyncio
 import json
+import operator
+import os
 import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
 from typing import Any, Dict, List, Optional, Union
 
 import sympy
 
+CACHE_SIZE = int(os.environ.get("MATH_CACHE_SIZE", 4096))
+WORKERS = int(os.environ.get("MATH_WORKERS", os.cpu_count() or 1))
+MAX_IN_FLIGHT = int(os.environ.get("MATH_MAX_IN_FLIGHT", 256))
+
+# Larger powers, or powers with a larger result, are left to sympy in the
+# worker processes rather than computed inline.
+MAX_FAST_EXPONENT = 1000
+MAX_FAST_RESULT_BITS = 100_000
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+def fast_evaluate(expression: str) -> Optional[Fraction]:
+    """
+    Evaluate plain integer arithmetic exactly, without sympy.
+
+    Args:
+        expression: The mathematical expression to evaluate
+
+    Returns:
+        The exact result, or None if the expression is anything else (floats,
+        symbols, functions, division by zero, huge powers), for sympy to handle
+    """
+    try:
+        # sympify reads "^" as a power, right-associative like "**"
+        tree = ast.parse(expression.strip().replace("^", "**"), mode="eval")
+        return _fast_value(tree.body)
+    except (SyntaxError, ValueError, ZeroDivisionError, OverflowError, RecursionError):
+        return None
+
+
+def _fast_value(node: ast.AST) -> Optional[Fraction]:
+    if isinstance(node, ast.Constant):
+        if type(node.value) is int:
+            return Fraction(node.value)
+        return None
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        operand = _fast_value(node.operand)
+        return None if operand is None else UNARY_OPERATORS[type(node.op)](operand)
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        left = _fast_value(node.left)
+        right = _fast_value(node.right)
+        if left is None or right is None:
+            return None
+        if isinstance(node.op, ast.Pow):
+            # Only integer exponents keep the result rational.
+            if right.denominator != 1 or abs(right) > MAX_FAST_EXPONENT:
+                return None
+            # Bound the size of the result before computing it: nested powers
+            # like ((10**1000)**1000)**10 would block the event loop.
+            bits = max(left.numerator.bit_length(), left.denominator.bit_length())
+            if bits * abs(right) > MAX_FAST_RESULT_BITS:
+                return None
+            if left == 0 and right < 0:
+                return None
+        result = BINARY_OPERATORS[type(node.op)](left, right)
+        return Fraction(result)
+    return None
+
+
+def sympy_evaluate(expression: str) -> Dict[str, Any]:
+    """Evaluate an expression with sympy; runs in the worker processes."""
+    try:
+        # Parse and evaluate the expression
+        result = sympy.sympify(expression)
+
+        # Format the result
+        return {
+            "result": str(result),
+            "steps": f"Evaluated {expression} = {result}"
+        }
+    except Exception as e:
+        return {
+            "error": f"Error evaluating expression: {str(e)}"
+        }
+
 
 class MathOperation:
-    """A class to handle math operations using sympy."""
-    
+    """A class to handle math operations using sympy, with a fast path and a cache in front of it."""
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "fast": 0, "sympy": 0}
+
     def evaluate(self, expression: str) -> Dict[str, Any]:
         """
         Evaluate a mathematical expression.
-        
+
         Args:
             expression: The mathematical expression to evaluate
-            
+
         Returns:
             Dict containing the result and steps
         """
-        try:
-            # Parse and evaluate the expression
-            result = sympy.sympify(expression)
-            
-            # Format the result
-            return {
-                "result": str(result),
-                "steps": f"Evaluated {expression} = {result}"
-            }
-        except Exception as e:
-            return {
-                "error": f"Error evaluating expression: {str(e)}"
-            }
+        result = self.evaluate_cheaply(expression)
+        if result is None:
+            self.stats["sympy"] += 1
+            result = self.remember(expression, sympy_evaluate(expression))
+        return result
+
+    def evaluate_cheaply(self, expression: str) -> Optional[Dict[str, Any]]:
+        """The result from the cache or the fast numeric path, or None if sympy is needed."""
+        with self._lock:
+            result = self._cache.get(expression)
+            if result is not None:
+                self._cache.move_to_end(expression)
+                self.stats["hits"] += 1
+                return result
+        value = fast_evaluate(expression)
+        if value is None:
+            return None
+        self.stats["fast"] += 1
+        # str(Fraction) is formatted like sympy's Integer and Rational ("7", "-1/3").
+        return self.remember(expression, {
+            "result": str(value),
+            "steps": f"Evaluated {expression} = {value}"
+        })
+
+    def remember(self, expression: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self._cache[expression] = result
+            self._cache.move_to_end(expression)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+
+math_op = MathOperation()
+executor: Optional[ProcessPoolExecutor] = None
+
+
+async def evaluate(expression: str) -> Dict[str, Any]:
+    """Evaluate an expression, off the event loop when it needs sympy."""
+    result = math_op.evaluate_cheaply(expression)
+    if result is not None:
+        return result
+    if executor is None:
+        return math_op.evaluate(expression)
+    math_op.stats["sympy"] += 1
+    result = await asyncio.get_running_loop().run_in_executor(executor, sympy_evaluate, expression)
+    return math_op.remember(expression, result)
+
+
+async def evaluate_many(expressions: List[str]) -> Dict[str, Any]:
+    """Evaluate a batch of expressions; the ones that need sympy are evaluated in parallel."""
+    results = await asyncio.gather(*(evaluate(str(expression)) for expression in expressions))
+    return {"results": list(results)}
 
 
 async def handle_request(request: Dict[str, Any]) -> Dict[str, Any]:
     """Process an incoming request."""
     content = request.get("content", "")
-    
+
     # If it's a function call, use the tool directly
     if "name" in request and "arguments" in request:
+        args = request["arguments"]
+        if isinstance(args, str):
+            args = json.loads(args)
         if request["name"] == "math_evaluate":
-            args = json.loads(request["arguments"])
-            expression = args.get("expression", "")
-            math_op = MathOperation()
-            return math_op.evaluate(expression)
-    
+            return await evaluate(args.get("expression", ""))
+        if request["name"] == "math_evaluate_many":
+            return await evaluate_many(args.get("expressions", []))
+
     # Otherwise, try to extract an expression from the content
-    math_op = MathOperation()
-    return math_op.evaluate(content)
+    return await evaluate(content)
+
+
+def respond(response: Dict[str, Any], request_id: Union[str, int, None] = None):
+    """Write one response line; only called from the event loop, so lines never interleave."""
+    if request_id is not None:
+        response = {"id": request_id, **response}
+    sys.stdout.write(json.dumps(response) + "\n")
+    sys.stdout.flush()
+
+
+async def process_line(line: str, slots: asyncio.Semaphore):
+    """Parse, process and answer one request line."""
+    request_id = None
+    try:
+        # Parse the request
+        request = json.loads(line)
+        request_id = request.get("id")
+
+        # Process the request
+        response = await handle_request(request)
+
+        # Send the response
+        respond(response, request_id)
+
+    except Exception as e:
+        respond({"error": str(e)}, request_id)
+    finally:
+        slots.release()
+
+
+async def open_stdin() -> Optional[asyncio.StreamReader]:
+    """Attach stdin to the event loop, or return None where pipes are not supported (e.g. Windows)."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=2 ** 24)
+    try:
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    except (NotImplementedError, ValueError, OSError):
+        return None
+    return reader
 
 
 async def handle_stdin_stdout():
-    """Handle stdin/stdout communication."""
+    """Handle stdin/stdout communication, with up to MAX_IN_FLIGHT requests in progress."""
+    loop = asyncio.get_running_loop()
+    reader = await open_stdin()
+    slots = asyncio.Semaphore(MAX_IN_FLIGHT)
+    tasks = set()
     while True:
-        try:
-            line = await asyncio.get_event_loop().run_in_executor(None, sys.stdin.readline)
-            if not line:
-                break
-                
-            # Parse the request
-            request = json.loads(line)
-            
-            # Process the request
-            response = await handle_request(request)
-            
-            # Send the response
-            print(json.dumps(response), flush=True)
-            
-        except Exception as e:
-            print(json.dumps({"error": str(e)}), flush=True)
+        if reader is not None:
+            line = (await reader.readline()).decode("utf-8")
+        else:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            break
+        if not line.strip():
+            continue
+
+        # Stop reading while too many requests are in progress
+        await slots.acquire()
+        task = asyncio.create_task(process_line(line, slots))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks)
 
 
 def register_tools() -> List[Dict[str, Any]]:
@@ -94,17 +293,36 @@ def register_tools() -> List[Dict[str, Any]]:
             },
             "required": ["expression"]
         }
+    }, {
+        "name": "math_evaluate_many",
+        "description": "Evaluates a list of mathematical expressions and returns their results in the same order",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "expressions": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "The mathematical expressions to evaluate"
+                }
+            },
+            "required": ["expressions"]
+        }
     }]
 
 
 async def main():
     """Main entry point for the server."""
+    global executor
     # Print tools registration for MCP discovery
     print(json.dumps({"tools": register_tools()}), flush=True)
-    
+
     # Handle stdin/stdout communication
-    await handle_stdin_stdout()
+    executor = ProcessPoolExecutor(max_workers=WORKERS)
+    try:
+        await handle_stdin_stdout()
+    finally:
+        executor.shutdown(cancel_futures=True)
 
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main())
@@ -1,22 +1,106 @@
+import atexit
+import gzip
 import os
 import json
+import queue
+import threading
 import time
 from datetime import datetime
 
+_STOP = object()
+
+
+class BatchedLogWriter:
+    """Appends JSON records to a JSONL file from a background thread.
+
+    `write` only puts the record on a queue, so the caller never waits for the
+    filesystem. The writer thread collects records for up to `flush_interval`
+    seconds (or `batch_size` records) and appends them in one write. With
+    `compress=True` every batch is appended as a gzip member, which
+    `gzip.open` reads back as one stream. Nothing is created on disk until the
+    first record arrives.
+    """
+
+    def __init__(self, path, flush_interval=2.0, batch_size=200, compress=False):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.compress = compress
+        self.queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def write(self, record):
+        # Enqueued under the lock, so a concurrent close() can not put _STOP
+        # ahead of a record on the queue of the thread it is stopping.
+        with self._lock:
+            if self._thread is None:
+                # Every writer thread gets its own queue: one started after a
+                # close() must not take the _STOP meant for the previous one.
+                self.queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, args=(self.queue,), name="log-writer", daemon=True)
+                self._thread.start()
+            self.queue.put(record)
+
+    def flush(self):
+        """Block until every record written so far is on disk."""
+        if self._thread is not None:
+            self.queue.join()
+
+    def close(self):
+        """Flush and stop the writer thread; called at session end and at exit."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self.queue.put(_STOP)
+        if thread is not None:
+            thread.join()
+
+    def _run(self, records_queue):
+        while True:
+            batch = [records_queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(records_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not _STOP]
+            try:
+                if records:
+                    self._append(records)
+            except OSError as e:
+                print(f"Error writing logs to {self.path}: {e}")
+            finally:
+                for _ in batch:
+                    records_queue.task_done()
+            if len(records) < len(batch):
+                return
+
+    def _append(self, records):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+        if self.compress:
+            data = gzip.compress(data)
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+
 class CallbackHandler:
     """Utility class to handle step callbacks in CrewAI agents"""
     
-    def __init__(self, log_dir="logs"):
+    def __init__(self, log_dir="logs", compress=False, flush_interval=2.0):
         self.log_dir = log_dir
-        os.makedirs(log_dir, exist_ok=True)
         self.current_session = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.session_dir = os.path.join(log_dir, self.current_session)
-        os.makedirs(self.session_dir, exist_ok=True)
         
-        # Create a session log file
-        self.session_log = os.path.join(self.session_dir, "session.log")
-        with open(self.session_log, "w") as f:
-            f.write(f"Session started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        # All the steps of a session go to a single append-only file, written in the background
+        self.session_log = os.path.join(self.session_dir, "steps.jsonl.gz" if compress else "steps.jsonl")
+        self.writer = BatchedLogWriter(self.session_log, flush_interval=flush_interval, compress=compress)
     
     def step_callback(self, step, agent_name):
         """Callback function for CrewAI agents to log their steps"""
@@ -45,25 +129,22 @@ class CallbackHandler:
         # Print to console
         print(log_message)
         
-        # Write to session log
-        with open(self.session_log, "a") as f:
-            f.write(log_message + "\n")
-        
-        # Save step details to a JSON file
-        step_file = os.path.join(self.session_dir, f"{agent_name.replace(' ', '_')}_step_{step_number}.json")
-        step_data = {
+        # Queue the step for the session log
+        self.writer.write({
+            "session": self.current_session,
             "timestamp": timestamp,
             "agent_name": agent_name,
             "step_number": step_number,
             "task": task,
             "output": output
-        }
-        
-        with open(step_file, "w") as f:
-            json.dump(step_data, f, indent=2)
+        })
         
         return step
 
+    def close(self):
+        """Write out the remaining steps of the session"""
+        self.writer.close()
+
 def print_progress_bar(iteration, total, prefix='', suffix='', length=50, fill='█'):
     """
     Call in a loop to create terminal progress bar
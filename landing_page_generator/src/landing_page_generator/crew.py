@@ -7,30 +7,31 @@ from tools.browser_tools import ScrapeWebsiteTool
 from tools.file_tools import FileTools
 from tools.search_tools import SearchInternetTool
 from tools.template_tools import TemplateTools
-# Import the official crewai-tools MCP integration and StdioServerParameters
+from tools.mcp_manager import get_mcp_server
 from mcp import StdioServerParameters
-from crewai_tools import MCPServerAdapter
 from crewai.tools import BaseTool
 
 import json
 import ast
+import asyncio
 import os
+import time
 
 from dotenv import load_dotenv
 load_dotenv()
 
 
-# Update MCP server configuration to use StdioServerParameters
-mcp_server_params = StdioServerParameters(
-    command="npx",
-    args=["@playwright/mcp@latest"],
-    env=os.environ
+# The Playwright MCP server is only started when an agent first needs its tools,
+# and is shared by every crew (and every landing page job) in the process.
+playwright_mcp = get_mcp_server(
+    "playwright",
+    StdioServerParameters(
+        command="npx",
+        args=["@playwright/mcp@latest"],
+        env=os.environ
+    ),
 )
 
-# Create MCP server adapter and get tools
-mcp_server_adapter = MCPServerAdapter(mcp_server_params)
-mcp_tools = mcp_server_adapter.tools
-
 # Helper function to ensure all tools are BaseTool instances
 def ensure_base_tools(tools_list):
     """Ensure all tools in the list are instances of BaseTool"""
@@ -51,7 +52,7 @@ class ExpandIdeaCrew:
         search_tool = SearchInternetTool()
         scrape_tool = ScrapeWebsiteTool()
         # Use list of individual MCP tools instead of a single MCP tool
-        tools = ensure_base_tools(mcp_tools)
+        tools = ensure_base_tools(playwright_mcp.tools())
         return Agent(
             config=self.agents_config['senior_idea_analyst'],
             allow_delegation=False,
@@ -66,7 +67,7 @@ class ExpandIdeaCrew:
         search_tool = SearchInternetTool()
         scrape_tool = ScrapeWebsiteTool()
         # Use list of individual MCP tools instead of a single MCP tool
-        tools = ensure_base_tools(mcp_tools)
+        tools = ensure_base_tools(playwright_mcp.tools())
         return Agent(
             config=self.agents_config['senior_strategist'],
             allow_delegation=False,
@@ -117,7 +118,7 @@ class ChooseTemplateCrew:
         # Collect all tools
         all_tools = [
             # Add individual MCP tools instead of a single MCP tool
-            *mcp_tools,  # Unpacking the list of tools
+            *playwright_mcp.tools(),  # Unpacking the list of tools
             TemplateTools.learn_landing_page_options,
             TemplateTools.copy_landing_page_template_to_project_folder,
             FileTools.write_file
@@ -247,33 +248,48 @@ class CreateContentCrew:
             verbose=True,
         )
     
+class ComponentCrewError(RuntimeError):
+    """Raised after the concurrent content crews of one or more components failed."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        failures = "; ".join(f"{path}: {error!r}" for path, error in errors.items())
+        super().__init__(f"Content creation failed for {len(errors)} component(s): {failures}")
+
 class LandingPageCrew():
-    def __init__(self, idea):
+    def __init__(self, idea, max_concurrency=None, packager=None):
         self.idea = idea
+        self.packager = packager
+        self.max_concurrency = max_concurrency or int(os.environ.get("CONTENT_CREW_CONCURRENCY", 4))
     
     def run(self):
-        try:
+        # Keep the MCP server up for the whole job; once the last job is done it
+        # stays warm for MCP_IDLE_TIMEOUT seconds and is then stopped.
+        with playwright_mcp.session():
             expanded_idea= self.runExpandIdeaCrew(self.idea)
                 
             components_paths_list = self.runChooseTemplateCrew(expanded_idea)
+            if self.packager is not None:
+                # The rest of the template will not change: package it while the components are written.
+                self.packager.prepackage(exclude=components_paths_list)
                 
             self.runCreateContentCrew(components_paths_list, expanded_idea)
-        finally:
-            # Make sure to stop the MCP server adapter when done
-            mcp_server_adapter.stop()
     
     def runExpandIdeaCrew(self,idea):
         inputs1 = {
                 "idea": str(idea)
         }
-        expanded_idea= ExpandIdeaCrew().crew().kickoff(inputs=inputs1)
+        # The crew's agents use the MCP tools: hold the server until the crew ends.
+        with playwright_mcp.session():
+            expanded_idea= ExpandIdeaCrew().crew().kickoff(inputs=inputs1)
         return str(expanded_idea)
 
     def runChooseTemplateCrew(self, expanded_idea):
         inputs2={
             "idea": expanded_idea
         }
-        components = ChooseTemplateCrew().crew().kickoff(inputs=inputs2)
+        with playwright_mcp.session():
+            components = ChooseTemplateCrew().crew().kickoff(inputs=inputs2)
         components= str(components)
         
         components = components.replace("\n", "").replace(" ",
@@ -290,20 +306,68 @@ class LandingPageCrew():
         return json.loads(result)
 
     def runCreateContentCrew(self,components, expanded_idea):
+        # Every component is its own file, so components are written by
+        # independent crews, CONTENT_CREW_CONCURRENCY (default 4) at a time.
+        components = list(dict.fromkeys(components))
+        if self.max_concurrency <= 1:
+            latencies = {component_path: self.runComponentCrew(component_path, expanded_idea)
+                         for component_path in components}
+        else:
+            results = asyncio.run(self.runComponentCrewsAsync(components, expanded_idea))
+            errors = {path: result for path, result in results.items() if isinstance(result, BaseException)}
+            latencies = {path: None if path in errors else result for path, result in results.items()}
+            if errors:
+                # Every crew has finished: fail the run like the sequential path does.
+                self.printLatencies(latencies)
+                raise ComponentCrewError(errors)
+        self.printLatencies(latencies)
+        return latencies
+
+    async def runComponentCrewsAsync(self, components, expanded_idea):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
 
-        for component_path in components:
-            file_content = open(
-            f"./workdir/{component_path.split('./')[-1]}",
-            "r"
-        ).read()
-            inputs3={
+        async def run(component_path):
+            async with semaphore:
+                return await self.runComponentCrewAsync(component_path, expanded_idea)
+
+        # A failed crew does not cancel the others; its exception is returned instead.
+        results = await asyncio.gather(*(run(component_path) for component_path in components),
+                                       return_exceptions=True)
+        return dict(zip(components, results))
+
+    def componentInputs(self, component_path, expanded_idea):
+        with open(f"./workdir/{component_path.split('./')[-1]}", "r") as f:
+            file_content = f.read()
+        return {
             "component": component_path,
             "expanded_idea": expanded_idea,
             "file_content": file_content
-            }
+        }
 
-            CreateContentCrew().crew().kickoff(inputs=inputs3)
+    def runComponentCrew(self, component_path, expanded_idea):
+        start = time.perf_counter()
+        CreateContentCrew().crew().kickoff(inputs=self.componentInputs(component_path, expanded_idea))
+        self.componentFinished(component_path)
+        return time.perf_counter() - start
 
-    
+    async def runComponentCrewAsync(self, component_path, expanded_idea):
+        start = time.perf_counter()
+        inputs3 = self.componentInputs(component_path, expanded_idea)
+        await CreateContentCrew().crew().kickoff_async(inputs=inputs3)
+        # Zipping blocks: keep it off the loop the other content crews run on.
+        await asyncio.to_thread(self.componentFinished, component_path)
+        return time.perf_counter() - start
+
+    def componentFinished(self, component_path):
+        # The component is final: package it now instead of at the end of the run.
+        if self.packager is not None:
+            try:
+                self.packager.add(component_path)
+            except OSError as e:
+                print(f"Error packaging {component_path}: {e}")
 
-    
\ No newline at end of file
+    def printLatencies(self, latencies):
+        print("\nComponent content latency:")
+        for component_path, seconds in latencies.items():
+            status = f"{seconds:.1f}s" if seconds is not None else "failed"
+            print(f"  {component_path}: {status}")
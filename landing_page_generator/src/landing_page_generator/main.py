@@ -2,7 +2,8 @@ import os
 import shutil
 from textwrap import dedent
 
-from crew import LandingPageCrew
+from crew import LandingPageCrew, callback_handler, playwright_mcp
+from tools.packager import ProjectPackager
 
 
 if __name__ == "__main__":
@@ -17,6 +18,8 @@ if __name__ == "__main__":
       The full run might take around ~10-45m. Enjoy your time back.\n\n
     """
   ))
+  # Start the browser MCP server while the idea is being typed.
+  playwright_mcp.prewarm()
   idea = input("# Describe what is your idea:\n\n")
   
   if not os.path.exists("./workdir"):
@@ -43,11 +46,21 @@ if __name__ == "__main__":
     )
     exit()
 
-  crew = LandingPageCrew(idea)
-  crew.run()
   zip_file = "workdir"
-  shutil.make_archive(zip_file, 'zip', 'workdir')
-  shutil.rmtree('workdir')
+  # Components are added to the archive as soon as they are done.
+  packager = ProjectPackager("workdir", f"{zip_file}.zip")
+  crew = LandingPageCrew(idea, packager=packager)
+  try:
+    crew.run()
+    packager.finish()
+  except BaseException:
+    # Do not leave a half-written archive behind.
+    packager.abort()
+    raise
+  finally:
+    # Write out the logged steps now rather than at interpreter exit.
+    callback_handler.close()
+    shutil.rmtree('workdir', ignore_errors=True)
   print("\n\n")
   print("==========================================")
   print("DONE!")
@@ -1,38 +1,39 @@
-import json
 import os
 
-import requests
-from crewai import Agent, Task
+from crewai import LLM
 from crewai.tools import BaseTool
 from unstructured.partition.html import partition_html
 
+from tools.chunker import chunk_elements
+from tools.page_cache import PAGE_CACHE
+from tools.summarizer import MapReduceSummarizer
+from tools.summary_store import SUMMARY_STORE
+
+_summarizer = None
+
+
+def summarizer() -> MapReduceSummarizer:
+    # One LLM client for every scrape, created on first use.
+    global _summarizer
+    if _summarizer is None:
+        model = os.environ.get("MODEL") or os.environ.get("OPENAI_MODEL_NAME", "gpt-4o-mini")
+        llm = LLM(model=model)
+        _summarizer = MapReduceSummarizer(
+            lambda prompt: llm.call([{"role": "user", "content": prompt}]),
+            model=model,
+            store=SUMMARY_STORE,
+        )
+    return _summarizer
+
+
+def summarize_html(html: str) -> str:
+    return summarizer().summarize(chunk_elements(partition_html(text=html)))
+
 
 class ScrapeWebsiteTool(BaseTool):
     name: str = "scrape_and_summarize_website"
     description: str = "Useful to scrape and summarize a website content"
 
     def _run(self, website: str) -> str:
-        url = f"https://chrome.browserless.io/content?token={os.environ['BROWSERLESS_API_KEY']}"
-        payload = json.dumps({"url": website})
-        headers = {'cache-control': 'no-cache', 'content-type': 'application/json'}
-        response = requests.request("POST", url, headers=headers, data=payload)
-        elements = partition_html(text=response.text)
-        content = "\n\n".join([str(el) for el in elements])
-        content = [content[i:i + 8000] for i in range(0, len(content), 8000)]
-        summaries = []
-        for chunk in content:
-            agent = Agent(
-                role='Principal Researcher',
-                goal=
-                'Do amazing researches and summaries based on the content you are working with',
-                backstory=
-                "You're a Principal Researcher at a big company and you need to do a research about a given topic.",
-                allow_delegation=False)
-            task = Task(
-                agent=agent,
-                description=
-                f'Analyze and summarize the content bellow, make sure to include the most relevant information in the summary, return only the summary nothing else.\n\nCONTENT\n----------\n{chunk}'
-            )
-            summary = task.execute()
-            summaries.append(summary)
-        return "\n\n".join(summaries)
+        # Pages (and their summaries) scraped recently by any crew are reused.
+        return PAGE_CACHE.summary(website, summarizer().key, summarize_html)
@@ -1,3 +1,5 @@
+import os
+
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 from typing import Optional
@@ -25,6 +27,10 @@ class WriteFileTool(BaseTool):
             path = path.replace("\n", "").replace(" ", "").replace("`", "")
             if not path.startswith("./workdir"):
                 path = f"./workdir/{path}"
+            # Template files are hardlinked into workdir; replace the link
+            # rather than writing through it into the template itself.
+            if os.path.lexists(path):
+                os.unlink(path)
             with open(path, "w") as f:
                 f.write(content)
             return f"File written to {path}."
@@ -0,0 +1,229 @@
+"""
+Process-wide lifecycle management for MCP servers.
+
+Starting an MCP server (e.g. `npx @playwright/mcp@latest`, which launches Node
+and a browser) takes seconds, so it should neither happen at import time nor
+once per crew. An `MCPServerManager` starts its server on first use, shares it
+between every crew that holds a reference, restarts it if it died, and shuts
+it down after it has been idle for a while.
+"""
+
+import atexit
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from crewai.tools import BaseTool
+
+DEFAULT_IDLE_TIMEOUT = float(os.environ.get("MCP_IDLE_TIMEOUT", 300))
+
+
+def _default_adapter_factory(server_params):
+    # Imported lazily so that importing the crews does not pull in the MCP stack.
+    from crewai_tools import MCPServerAdapter
+    return MCPServerAdapter(server_params)
+
+
+def _adapter_is_alive(adapter) -> bool:
+    """Best-effort health check of an MCPServerAdapter.
+
+    The adapter runs the server session on a background thread (mcpadapt's
+    `MCPAdapt.thread`); when that thread is gone, the server is gone too.
+    Adapters that do not expose it are assumed to be healthy.
+    """
+    thread = getattr(getattr(adapter, "_adapter", None), "thread", None)
+    if isinstance(thread, threading.Thread):
+        return thread.is_alive()
+    return True
+
+
+class MCPServerManager:
+    """
+    Lazily started, reference-counted MCP server shared across crews.
+
+    Use `session()` around a job to keep the server up for its whole duration;
+    `tools()` returns the server's tools, starting it if needed. When the last
+    session ends the server stays warm for `idle_timeout` seconds, so the next
+    job in the same process reuses it, and is stopped after that.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        server_params: Any,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        health_check: Callable[[Any], bool] = _adapter_is_alive,
+        adapter_factory: Callable[[Any], Any] = _default_adapter_factory,
+    ):
+        """
+        Args:
+            name (str): Name used in log messages.
+            server_params: Parameters of the server, e.g. `StdioServerParameters`.
+            idle_timeout (float): Seconds to keep an unused server running.
+                0 stops it as soon as the last session ends.
+            health_check (callable): Returns False if a running adapter is dead.
+            adapter_factory (callable): Starts the server and returns an object
+                with `tools` and `stop()`, by default an `MCPServerAdapter`.
+        """
+        self.name = name
+        self.server_params = server_params
+        self.idle_timeout = idle_timeout
+        self.health_check = health_check
+        self.adapter_factory = adapter_factory
+        self.starts = 0
+        self._adapter = None
+        self._tools: List[BaseTool] = []
+        self._refs = 0
+        self._lock = threading.RLock()
+        self._idle_timer: Optional[threading.Timer] = None
+        self._warming: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._adapter is not None
+
+    def tools(self) -> List[BaseTool]:
+        """
+        Get the server's tools, starting or restarting the server if needed.
+
+        The tools only keep the server running while a reference is held, so
+        build and run the crew that uses them inside a `session()`; tools
+        fetched outside one are stopped with the server after `idle_timeout`.
+
+        Returns:
+            List[BaseTool]: The tools of the running server
+        """
+        with self._lock:
+            warming = self._warming
+        if warming is not None and warming is not threading.current_thread():
+            warming.join()
+        with self._lock:
+            if self._adapter is not None and not self.health_check(self._adapter):
+                print(f"MCP server '{self.name}' is not responding, restarting it")
+                self._stop_adapter()
+            if self._adapter is None:
+                self._start_adapter()
+            if self._refs == 0:
+                # Used outside a session: make sure it does not run forever.
+                self._schedule_idle_shutdown()
+            return self._tools
+
+    def prewarm(self) -> None:
+        """Start the server on a background thread so the first job does not wait for it."""
+        with self._lock:
+            if self._adapter is not None or self._warming is not None:
+                return
+            self._warming = threading.Thread(target=self._warm, name=f"mcp-{self.name}-warmup", daemon=True)
+            self._warming.start()
+
+    def acquire(self) -> List[BaseTool]:
+        """Take a reference on the server, keeping it running until `release()`."""
+        with self._lock:
+            self._refs += 1
+            self._cancel_idle_shutdown()
+        try:
+            return self.tools()
+        except Exception:
+            self.release()
+            raise
+
+    def release(self) -> None:
+        """Drop a reference; the last one schedules the idle shutdown."""
+        with self._lock:
+            self._refs = max(0, self._refs - 1)
+            if self._refs == 0:
+                self._schedule_idle_shutdown()
+
+    @contextmanager
+    def session(self):
+        """Keep the server running for the duration of the `with` block."""
+        tools = self.acquire()
+        try:
+            yield tools
+        finally:
+            self.release()
+
+    def stop(self) -> None:
+        """Stop the server now, regardless of the sessions holding it."""
+        with self._lock:
+            self._cancel_idle_shutdown()
+            self._stop_adapter()
+
+    def _warm(self) -> None:
+        try:
+            self.tools()
+        except Exception as e:
+            print(f"Warning: Could not prewarm MCP server '{self.name}': {e}")
+        finally:
+            with self._lock:
+                self._warming = None
+
+    def _start_adapter(self) -> None:
+        self._adapter = self.adapter_factory(self.server_params)
+        self._tools = [tool for tool in self._adapter.tools if isinstance(tool, BaseTool)]
+        self.starts += 1
+
+    def _stop_adapter(self) -> None:
+        adapter, self._adapter, self._tools = self._adapter, None, []
+        if adapter is not None:
+            try:
+                adapter.stop()
+            except Exception as e:
+                print(f"Error stopping MCP server '{self.name}': {e}")
+
+    def _schedule_idle_shutdown(self) -> None:
+        self._cancel_idle_shutdown()
+        if self._adapter is None:
+            return
+        if self.idle_timeout <= 0:
+            self._stop_adapter()
+            return
+        self._idle_timer = threading.Timer(self.idle_timeout, self._shutdown_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _cancel_idle_shutdown(self) -> None:
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _shutdown_if_idle(self) -> None:
+        with self._lock:
+            if self._refs == 0:
+                self._idle_timer = None
+                self._stop_adapter()
+
+
+_managers: Dict[str, MCPServerManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_mcp_server(name: str, server_params: Any = None, **kwargs) -> MCPServerManager:
+    """
+    Get the process-wide manager for the server called `name`, creating it on first use.
+
+    Args:
+        name (str): Name of the server, e.g. "playwright".
+        server_params: Parameters of the server; only used when the manager is created.
+        **kwargs: Passed on to `MCPServerManager`.
+
+    Returns:
+        MCPServerManager: The shared manager
+    """
+    with _managers_lock:
+        manager = _managers.get(name)
+        if manager is None:
+            if server_params is None:
+                raise ValueError(f"No MCP server named '{name}' has been configured")
+            manager = _managers[name] = MCPServerManager(name, server_params, **kwargs)
+        return manager
+
+
+@atexit.register
+def stop_all_mcp_servers() -> None:
+    """Stop every managed MCP server; registered to run at interpreter exit."""
+    with _managers_lock:
+        managers = list(_managers.values())
+    for manager in managers:
+        manager.stop()
@@ -1,27 +1,314 @@
 """
-DEPRECATED: This module is no longer in use. 
-The implementation has been replaced with the official crewai-tools MCPServerAdapter.
+MCP servers as CrewAI tools, through LangChain's MCP adapters.
 
-See crew.py for the updated implementation which uses:
-    from crewai_tools import MCPServerAdapter
+`MCPServerToolProvider` opens one session per configured server and adapts
+every tool of those servers to a CrewAI `BaseTool` (`MCPToolAdapter`). All
+sessions and tool calls live on one background event loop (`MCPEventLoop`,
+see `get_mcp_event_loop`), so synchronous and asynchronous agents can call
+tools concurrently without opening a loop or a session per call. Calls are
+routed to the server that owns the tool, within its concurrency and queue
+limits, and time out after MCP_CALL_TIMEOUT seconds.
+
+The crews in crew.py use crewai-tools' `MCPServerAdapter` (managed by
+`tools.mcp_manager`) for the Playwright server; this provider is what
+`examples/mcp_agent_example.py` and the README's multi-server setup use.
 """
 
 import os
 import json
+import time
 import asyncio
 import threading
+import concurrent.futures
+import anyio
 from crewai.tools import BaseTool
 from langchain_mcp_adapters.client import MultiServerMCPClient
-from typing import Dict, Any, Optional, List, Callable, Type, ClassVar
+from typing import Dict, Any, Optional, Iterable, List, Callable, Type, ClassVar, Coroutine
 from pydantic import BaseModel, Field, root_validator
 
+DEFAULT_CALL_TIMEOUT = float(os.environ.get("MCP_CALL_TIMEOUT", 60))
+DEFAULT_STARTUP_TIMEOUT = float(os.environ.get("MCP_STARTUP_TIMEOUT", 30))
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("MCP_MAX_CONCURRENCY", 4))
+DEFAULT_MAX_QUEUE = int(os.environ.get("MCP_MAX_QUEUE", 32))
+STOP_TIMEOUT = 10
+
+
+class MCPEventLoop:
+    """
+    An asyncio event loop running forever on a daemon thread.
+
+    MCP sessions are bound to the loop they were opened on, so every session
+    and every tool call lives on this one loop; synchronous and asynchronous
+    callers hand their coroutines over with `run_coroutine_threadsafe`, and
+    any number of calls can be in flight at once.
+    """
+
+    def __init__(self, name: str = "mcp-event-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop and return a thread-safe future of its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the loop and block until it finishes.
+
+        Raises:
+            TimeoutError: If it did not finish within `timeout` seconds; it is cancelled.
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("MCPEventLoop.call() would block its own loop; await acall() instead")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    async def acall(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and await it from any other loop (or this one)."""
+        if asyncio.get_running_loop() is self.loop:
+            return await asyncio.wait_for(coro, timeout)
+        # wait_for cancels the wrapped future on timeout, which cancels the call on the MCP loop.
+        return await asyncio.wait_for(asyncio.wrap_future(self.submit(coro)), timeout)
+
+
+_event_loop: Optional[MCPEventLoop] = None
+_event_loop_lock = threading.Lock()
+
+
+def get_mcp_event_loop() -> MCPEventLoop:
+    """Get the process-wide MCP event loop, starting it on first use."""
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = MCPEventLoop()
+        return _event_loop
+
+
+class MCPServerBusyError(RuntimeError):
+    """Raised when a call is rejected because the server's queue is full."""
+
+
+class MCPCallInterruptedError(RuntimeError):
+    """Raised when the server was lost during a call that may already have run, so it is not retried."""
+
+
+def _is_connection_error(error: BaseException) -> bool:
+    """True for errors that mean the transport to the server is gone, e.g. a crashed stdio server."""
+    if isinstance(error, (ConnectionError, EOFError, anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream)):
+        return True
+    return "connection closed" in str(error).lower()
+
+
+class LatencyHistogram:
+    """Latencies of the calls to one tool, in fixed, roughly logarithmic millisecond buckets."""
+
+    BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+    def __init__(self):
+        self.buckets = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float, error: bool = False):
+        ms = seconds * 1000
+        index = 0
+        while index < len(self.BOUNDS_MS) and ms > self.BOUNDS_MS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.errors += error
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound (in ms) of the bucket holding the given fraction of the calls."""
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen and seen >= fraction * self.count:
+                return min(self.BOUNDS_MS[index], round(self.max_ms, 1)) if index < len(self.BOUNDS_MS) else round(self.max_ms, 1)
+        return 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={bound}ms" for bound in self.BOUNDS_MS] + [f">{self.BOUNDS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": {label: bucket for label, bucket in zip(labels, self.buckets) if bucket},
+        }
+
+
+class MCPServerRoute:
+    """
+    One server behind an `MCPServerToolProvider`: its session, its tools and its limits.
+
+    At most `max_concurrency` calls run on the server at once and at most
+    `max_queue` more wait for a slot; further calls are rejected right away,
+    so a slow server cannot tie up every agent. A stdio server whose process
+    died is restarted. A call is only sent again when the server was already
+    gone before it was sent, or when its tool is listed in `retry_tools`:
+    tools such as a browser's click or navigate are not idempotent, and a
+    call lost mid-way may already have run.
+    All methods run on the MCP event loop.
+    """
+
+    def __init__(self, name: str, config: Dict[str, Any], max_concurrency: int, max_queue: int,
+                 retry_tools: Iterable[str] = ()):
+        self.name = name
+        self.config = config
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry_tools = set(retry_tools)
+        self.tools: Dict[str, Any] = {}
+        self.latencies: Dict[str, LatencyHistogram] = {}
+        self.generation = 0
+        self.restarts = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._restart_lock = asyncio.Lock()
+        self._session: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    @property
+    def restartable(self) -> bool:
+        return self.config.get("transport", "stdio") == "stdio"
+
+    @property
+    def running(self) -> bool:
+        return self._session is not None and not self._session.done()
+
+    async def start(self):
+        """Start the server and wait until its tools are listed."""
+        ready = asyncio.get_running_loop().create_future()
+        self._stopping = asyncio.Event()
+        self._session = asyncio.create_task(self._hold_session(ready, self._stopping), name=f"mcp-{self.name}")
+        await ready
+        self.generation += 1
+
+    async def _hold_session(self, ready: asyncio.Future, stopping: asyncio.Event):
+        # The session is entered and exited by this one task, as the stdio and
+        # SSE transports require, and stays open until `stopping` is set.
+        try:
+            async with MultiServerMCPClient({self.name: self.config}) as client:
+                self.tools = {tool.name: tool for tool in client.get_tools()}
+                ready.set_result(None)
+                await stopping.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                print(f"MCP server '{self.name}' session ended: {e}")
+        finally:
+            self.tools = {}
+            if not ready.done():
+                ready.cancel()
+
+    async def stop(self):
+        session, self._session = self._session, None
+        if session is None:
+            return
+        self._stopping.set()
+        try:
+            await asyncio.wait_for(session, STOP_TIMEOUT)
+        except Exception as e:
+            print(f"Error closing MCP server '{self.name}': {e}")
+
+    async def restart(self, generation: int):
+        """Restart the server, unless another call already did since `generation`."""
+        async with self._restart_lock:
+            if self.generation != generation:
+                return
+            print(f"MCP server '{self.name}' is not responding, restarting it")
+            await self.stop()
+            await self.start()
+            self.restarts += 1
+
+    async def call(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """Call one of the server's tools within the server's limits."""
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise MCPServerBusyError(
+                f"MCP server '{self.name}' is busy ({self.in_flight} calls running, {self.waiting} waiting)"
+            )
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        histogram = self.latencies.setdefault(tool_name, LatencyHistogram())
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await self._invoke(tool_name, arguments)
+            failed = False
+            return result
+        finally:
+            histogram.record(time.perf_counter() - started, error=failed)
+            self.in_flight -= 1
+            self._slots.release()
+
+    async def _invoke(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        generation = self.generation
+        if not self.running and self.restartable:
+            # Gone before anything was sent: restarting and calling is safe.
+            await self.restart(generation)
+            generation = self.generation
+        try:
+            return await self._tool(tool_name).ainvoke(arguments)
+        except Exception as e:
+            if not (self.restartable and _is_connection_error(e)):
+                raise
+            error = e
+        # The request may have reached the server before the transport broke.
+        await self.restart(generation)
+        if tool_name not in self.retry_tools:
+            raise MCPCallInterruptedError(
+                f"MCP server '{self.name}' was lost during '{tool_name}' and has been restarted; "
+                f"the call was not retried as it may have run already ({error})"
+            ) from error
+        return await self._tool(tool_name).ainvoke(arguments)
+
+    def _tool(self, tool_name: str) -> Any:
+        tool = self.tools.get(tool_name)
+        if tool is None:
+            raise RuntimeError(f"MCP server '{self.name}' is not running or has no tool '{tool_name}'")
+        return tool
+
 
 class MCPToolAdapter(BaseTool):
     """
     Adapter class to convert LangChain compatible MCP tools to CrewAI BaseTool.
     This acts as a wrapper for individual tools from the MCP client.
+
+    Calls are dispatched to the event loop that owns the MCP session
+    (`event_loop`), through `router` when the tool belongs to an
+    `MCPServerToolProvider`, and give up after `timeout` seconds.
     """
     langchain_tool: Any = None
+    event_loop: Any = None
+    router: Any = None
+    server_name: Optional[str] = None
+    timeout: Optional[float] = DEFAULT_CALL_TIMEOUT
     
     class Config:
         arbitrary_types_allowed = True
@@ -42,6 +329,11 @@ class MCPToolAdapter(BaseTool):
         
         return values
     
+    def _invocation(self, kwargs: Dict[str, Any]) -> Coroutine:
+        if self.router is not None:
+            return self.router.call(self.server_name, self.langchain_tool.name, kwargs)
+        return self.langchain_tool.ainvoke(kwargs)
+    
     def _run(self, **kwargs) -> str:
         """
         Run the MCP tool synchronously.
@@ -55,14 +347,16 @@ class MCPToolAdapter(BaseTool):
         if not self.langchain_tool:
             return "Error: Langchain tool not initialized"
             
-        # Handle synchronous calls by creating a new event loop
-        loop = asyncio.new_event_loop()
+        # Hand the call over to the loop that owns the session and wait for it
+        event_loop = self.event_loop or get_mcp_event_loop()
         try:
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self.langchain_tool.ainvoke(kwargs))
-            return result
-        finally:
-            loop.close()
+            return event_loop.call(self._invocation(kwargs), self.timeout)
+        except TimeoutError:
+            return f"Error: MCP tool '{self.name}' did not answer within {self.timeout} seconds"
+        except MCPServerBusyError as e:
+            return f"Error: {e}, try again later"
+        except MCPCallInterruptedError as e:
+            return f"Error: {e}"
     
     async def _arun(self, **kwargs) -> str:
         """
@@ -77,89 +371,118 @@ class MCPToolAdapter(BaseTool):
         if not self.langchain_tool:
             return "Error: Langchain tool not initialized"
             
-        result = await self.langchain_tool.ainvoke(kwargs)
-        return result
+        event_loop = self.event_loop or get_mcp_event_loop()
+        try:
+            return await event_loop.acall(self._invocation(kwargs), self.timeout)
+        except TimeoutError:
+            return f"Error: MCP tool '{self.name}' did not answer within {self.timeout} seconds"
+        except MCPServerBusyError as e:
+            return f"Error: {e}, try again later"
+        except MCPCallInterruptedError as e:
+            return f"Error: {e}"
 
 
 class MCPServerToolProvider:
     """
     Provider class that initializes MCP client and returns a list of adapted tools.
     This is not a tool itself but provides multiple tools.
+
+    Each server gets its own session (an `MCPServerRoute`), opened once on the
+    shared MCP event loop and held open until `close()`. The provider routes
+    every tool call to the server that owns the tool, within that server's
+    concurrency and queue limits, and keeps latency histograms per tool.
     """
-    def __init__(self, server_config=None):
+    def __init__(
+        self,
+        server_config=None,
+        call_timeout: Optional[float] = DEFAULT_CALL_TIMEOUT,
+        startup_timeout: float = DEFAULT_STARTUP_TIMEOUT,
+    ):
         """
         Initialize the MCP Server Tool Provider.
         
         Args:
             server_config (dict, optional): Configuration for MCP servers.
+                Besides the client's own settings, a server may set
+                `max_concurrency` and `max_queue` (defaults: the
+                MCP_MAX_CONCURRENCY and MCP_MAX_QUEUE variables, or 4 and 32),
+                and `retry_tools`, the idempotent tools whose calls may be
+                sent again after the server crashed during them.
                 Example: {
                     "math": {
                         "command": "python",
                         "args": ["/path/to/math_server.py"],
                         "transport": "stdio",
+                        "retry_tools": ["math_evaluate"],
+                    },
+                    "playwright": {
+                        "command": "npx",
+                        "args": ["@playwright/mcp@latest"],
+                        "max_concurrency": 2,
                     },
                     "weather": {
                         "url": "http://localhost:8000/sse",
                         "transport": "sse",
                     }
                 }
+            call_timeout (float, optional): Seconds after which a tool call is
+                cancelled, None to wait forever.
+            startup_timeout (float): Seconds to wait for the servers to start.
         """
         self.server_config = server_config or {}
-        self.client = None
+        self.call_timeout = call_timeout
+        self.startup_timeout = startup_timeout
+        self.routes: Dict[str, MCPServerRoute] = {}
+        self.tool_servers: Dict[str, str] = {}
         self.tools = []
         self._initialized = False
+        self._event_loop = get_mcp_event_loop()
         
         # Try to initialize immediately if possible
         self._try_initialize()
     
     def _try_initialize(self):
-        """Try to initialize the client synchronously if possible."""
+        """Start the servers on the MCP event loop and wait until their tools are available."""
         try:
-            # Run initialization in a separate thread if we're in an event loop
-            if asyncio.get_event_loop().is_running():
-                thread = threading.Thread(target=self._thread_initialize)
-                thread.daemon = True  # Don't block program exit
-                thread.start()
-                thread.join(timeout=10)  # Wait for up to 10 seconds
-            else:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    loop.run_until_complete(self._initialize_client())
-                finally:
-                    loop.close()
+            self._event_loop.call(self._initialize_routes(), self.startup_timeout)
         except Exception as e:
             print(f"Warning: Could not initialize MCPServerToolProvider: {e}")
+            self._event_loop.submit(self._stop_routes())
             self._initialized = False
     
-    def _thread_initialize(self):
-        """Initialize the client in a separate thread."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(self._initialize_client())
-        finally:
-            loop.close()
+    async def _initialize_routes(self):
+        """Start every configured server concurrently and adapt the tools of those that came up."""
+        for name, config in self.server_config.items():
+            config = dict(config)
+            max_concurrency = config.pop("max_concurrency", DEFAULT_MAX_CONCURRENCY)
+            max_queue = config.pop("max_queue", DEFAULT_MAX_QUEUE)
+            retry_tools = config.pop("retry_tools", ())
+            self.routes[name] = MCPServerRoute(name, config, max_concurrency, max_queue, retry_tools)
+        
+        results = await asyncio.gather(*(route.start() for route in self.routes.values()), return_exceptions=True)
+        
+        # Adapt each LangChain tool to a CrewAI BaseTool
+        self.tools = []
+        for route, result in zip(self.routes.values(), results):
+            if isinstance(result, BaseException):
+                print(f"Error initializing MCP server '{route.name}': {result}")
+                continue
+            for tool in route.tools.values():
+                if tool.name in self.tool_servers:
+                    print(f"Warning: MCP tool '{tool.name}' of server '{route.name}' shadows the one of '{self.tool_servers[tool.name]}'")
+                self.tool_servers[tool.name] = route.name
+                self.tools.append(MCPToolAdapter(
+                    langchain_tool=tool,
+                    event_loop=self._event_loop,
+                    router=self,
+                    server_name=route.name,
+                    timeout=self.call_timeout,
+                ))
+        self._initialized = any(route.running for route in self.routes.values())
     
-    async def _initialize_client(self):
-        """Initialize the MCP client and get available tools."""
-        try:
-            self.client = MultiServerMCPClient(self.server_config)
-            await self.client.__aenter__()
-            langchain_tools = self.client.get_tools()
-            
-            # Adapt each LangChain tool to a CrewAI BaseTool
-            self.tools = []
-            for tool in langchain_tools:
-                # Create adapter instance
-                adapter = MCPToolAdapter(langchain_tool=tool)
-                self.tools.append(adapter)
-                
-            self._initialized = True
-        except Exception as e:
-            print(f"Error initializing MCP client: {e}")
-            self._initialized = False
-            raise
+    async def call(self, server_name: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """Call a tool on the server that owns it; runs on the MCP event loop."""
+        return await self.routes[server_name].call(tool_name, arguments)
     
     def get_tools(self) -> List[BaseTool]:
         """
@@ -172,15 +495,48 @@ class MCPServerToolProvider:
             print("Warning: MCP tools not initialized. Returning empty list.")
         return self.tools
     
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the load and latency statistics of every server and tool.
+        
+        Returns:
+            Dict[str, Any]: Per server: its state, restarts, rejected calls,
+                running and waiting calls, and a latency histogram per tool
+        """
+        return {
+            name: {
+                "running": route.running,
+                "restarts": route.restarts,
+                "rejected": route.rejected,
+                "in_flight": route.in_flight,
+                "waiting": route.waiting,
+                "tools": {tool: histogram.snapshot() for tool, histogram in route.latencies.items()},
+            }
+            for name, route in self.routes.items()
+        }
+    
+    def report(self) -> str:
+        """One line per tool with its call count, errors and latency percentiles."""
+        lines = []
+        for name, server in self.stats().items():
+            lines.append(f"MCP server '{name}': {server['restarts']} restarts, {server['rejected']} rejected calls")
+            for tool, latency in server["tools"].items():
+                lines.append(
+                    f"  {tool}: {latency['count']} calls, {latency['errors']} errors, "
+                    f"p50 {latency['p50_ms']}ms, p95 {latency['p95_ms']}ms, max {latency['max_ms']}ms"
+                )
+        return "\n".join(lines)
+    
+    async def _stop_routes(self):
+        await asyncio.gather(*(route.stop() for route in self.routes.values()))
+    
     async def close(self):
-        """Close the MCP client connection."""
-        if self.client:
-            try:
-                await self.client.__aexit__(None, None, None)
-            except Exception as e:
-                print(f"Error closing MCP client: {e}")
-            finally:
-                self.client = None
+        """Close the MCP client connections."""
+        self._initialized = False
+        try:
+            await self._event_loop.acall(self._stop_routes())
+        except Exception as e:
+            print(f"Error closing MCP client: {e}")
 
 
 class MCPServerTool(BaseTool):
@@ -0,0 +1,212 @@
+"""
+Streams the generated landing page project into a zip archive.
+
+The template files the crews will not touch are packaged in the background
+while the content crews run, and every component as soon as its crew has
+finished with it, so little is left to do when the run ends. Unchanged
+template files are recognized by being the same file as the template's (see
+`link_or_copy`); with ``PACKAGE_TEMPLATE_FILES=skip`` they are left out of the
+archive and only listed in the manifest. Files that are already compressed
+(images, fonts, archives) are stored as they are rather than deflated again.
+Every archive gets a ``manifest.json`` with the size, SHA-256 and origin of
+each file. Files that changed or disappeared after they were packaged are
+detected at the end, and the archive is then rebuilt from the final tree.
+"""
+import hashlib
+import json
+import os
+import threading
+import zipfile
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+DEFAULT_TEMPLATE_FILES = os.environ.get("PACKAGE_TEMPLATE_FILES", "include")
+MANIFEST = "manifest.json"
+BLOCK_SIZE = 2 ** 20
+COMPRESSED_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".ico", ".mp4", ".webm", ".mp3",
+    ".woff", ".woff2", ".zip", ".gz", ".tgz", ".br", ".zst", ".pdf",
+}
+
+# sha256 of skipped template files by (device, inode, mtime, size): a template
+# used by several jobs of the same process is hashed only once.
+_template_hashes: Dict[tuple, str] = {}
+
+
+class ProjectPackager():
+    """Zip archive of `workdir`, written while the crews are still running."""
+
+    def __init__(self, workdir: str = "workdir", archive: str = "workdir.zip", templates: str = "templates",
+                 template_files: Optional[str] = None):
+        """
+        Args:
+            workdir (str): Folder the project is generated in.
+            archive (str): Path of the zip archive to create.
+            templates (str): Folder the templates were copied from.
+            template_files (str): "include" to archive unchanged template
+                files, "skip" to only list them in the manifest.
+        """
+        self.workdir = workdir
+        self.archive = archive
+        self.templates = templates
+        self.template_files = template_files or DEFAULT_TEMPLATE_FILES
+        if self.template_files not in ("include", "skip"):
+            raise ValueError(f"PACKAGE_TEMPLATE_FILES must be 'include' or 'skip', not '{self.template_files}'")
+        self.manifest: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._prepackaging: Optional[threading.Thread] = None
+        self._aborted = False
+        self._partial = f"{archive}.part"
+        self._zip = zipfile.ZipFile(self._partial, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def add(self, path: str) -> None:
+        """
+        Package a finished file of the project now.
+
+        `path` may be relative to the current directory or to `workdir`.
+
+        Raises:
+            FileNotFoundError: If `path` is not a file of the project.
+        """
+        name = self._name(path)
+        if name is None:
+            raise FileNotFoundError(f"{path} is not a file of {self.workdir}")
+        with self._lock:
+            if name not in self.manifest:
+                self._add(name)
+
+    def prepackage(self, exclude: Iterable[str] = ()) -> None:
+        """Start packaging every file of the project but `exclude` (the files still to be written) in the background."""
+        excluded = {self._name(path) for path in exclude} - {None}
+        self._prepackaging = threading.Thread(target=self._prepackage, args=(excluded,), name="prepackage", daemon=True)
+        self._prepackaging.start()
+
+    def finish(self) -> str:
+        """Package every file not packaged yet, write the manifest and return the archive path."""
+        if self._prepackaging is not None:
+            self._prepackaging.join()
+        with self._lock:
+            names = list(self._files())
+            stale = [name for name in self.manifest if name not in names or self._changed(name)]
+            if stale:
+                # Zip entries can not be replaced: rebuild the archive from the final tree.
+                print(f"{len(stale)} file(s) changed after they were packaged, rebuilding the archive")
+                self._rebuild(names, set(stale))
+            for name in names:
+                if name not in self.manifest:
+                    self._add(name)
+            self._zip.writestr(MANIFEST, json.dumps({"files": self.manifest}, indent=2))
+            self._zip.close()
+            os.replace(self._partial, self.archive)
+        return self.archive
+
+    def abort(self) -> None:
+        """Stop packaging and remove the partial archive, after a failed run."""
+        self._aborted = True
+        if self._prepackaging is not None:
+            self._prepackaging.join()
+        with self._lock:
+            self._zip.close()
+            try:
+                os.remove(self._partial)
+            except FileNotFoundError:
+                pass
+
+    def _rebuild(self, names: List[str], stale: Set[str]) -> None:
+        """Write a new partial archive: unchanged entries are copied from the old one, the rest is packaged again."""
+        previous = self._partial + ".old"
+        self._zip.close()
+        os.replace(self._partial, previous)
+        manifest, self.manifest = self.manifest, {}
+        self._zip = zipfile.ZipFile(self._partial, "w", compression=zipfile.ZIP_DEFLATED)
+        with zipfile.ZipFile(previous) as old:
+            packaged = set(old.namelist())
+            for name in names:
+                if name not in manifest or name in stale:
+                    continue
+                if name in packaged:
+                    info = old.getinfo(name)
+                    with old.open(info) as source, self._zip.open(info, "w", force_zip64=info.file_size > 2 ** 31) as target:
+                        for block in iter(lambda: source.read(BLOCK_SIZE), b""):
+                            target.write(block)
+                self.manifest[name] = manifest[name]
+        os.remove(previous)
+
+    def _prepackage(self, excluded: Set[str]) -> None:
+        try:
+            for name in self._files():
+                if self._aborted:
+                    return
+                if name in excluded:
+                    continue
+                # One file at a time, so finished components never wait long.
+                with self._lock:
+                    if name not in self.manifest:
+                        self._add(name)
+        except OSError as e:
+            print(f"Warning: could not prepackage the project, it will be packaged at the end: {e}")
+
+    def _files(self) -> Iterator[str]:
+        for root, dirs, files in os.walk(self.workdir):
+            dirs.sort()
+            for file in sorted(files):
+                yield os.path.relpath(os.path.join(root, file), self.workdir).replace(os.sep, "/")
+
+    def _name(self, path: str) -> Optional[str]:
+        """Name of the project file at `path` in the archive, or None if there is no such file."""
+        workdir = os.path.realpath(self.workdir)
+        # Components paths come from the LLM: "./workdir/src/App.jsx", "src/App.jsx", "/src/App.jsx"...
+        for candidate in (path, os.path.join(self.workdir, path.lstrip("/\\"))):
+            real = os.path.realpath(candidate)
+            if real.startswith(workdir + os.sep) and os.path.isfile(real):
+                return os.path.relpath(real, workdir).replace(os.sep, "/")
+        return None
+
+    def _add(self, name: str) -> None:
+        path = os.path.join(self.workdir, name)
+        stat = os.stat(path)
+        if not self._is_template_file(name, stat):
+            entry = {"source": "generated", **self._write(path, name)}
+        elif self.template_files == "include":
+            entry = {"source": "template", **self._write(path, name)}
+        else:
+            entry = {"source": "template", "size": stat.st_size, "sha256": self._template_hash(path, stat), "skipped": True}
+        entry["mtime_ns"] = stat.st_mtime_ns
+        self.manifest[name] = entry
+
+    def _is_template_file(self, name: str, stat: os.stat_result) -> bool:
+        try:
+            template = os.stat(os.path.join(self.templates, name))
+        except OSError:
+            return False
+        if (stat.st_dev, stat.st_ino) == (template.st_dev, template.st_ino):
+            return True
+        # Copied rather than linked (e.g. across devices): copy2 keeps the mtime.
+        return (stat.st_size, stat.st_mtime_ns) == (template.st_size, template.st_mtime_ns)
+
+    def _template_hash(self, path: str, stat: os.stat_result) -> str:
+        key = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if key not in _template_hashes:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+                    digest.update(block)
+            _template_hashes[key] = digest.hexdigest()
+        return _template_hashes[key]
+
+    def _write(self, path: str, name: str) -> Dict:
+        info = zipfile.ZipInfo.from_file(path, name)
+        compressed = os.path.splitext(name)[1].lower() in COMPRESSED_EXTENSIONS
+        info.compress_type = zipfile.ZIP_STORED if compressed else zipfile.ZIP_DEFLATED
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as source, self._zip.open(info, "w", force_zip64=info.file_size > 2 ** 31) as target:
+            for block in iter(lambda: source.read(BLOCK_SIZE), b""):
+                digest.update(block)
+                target.write(block)
+                size += len(block)
+        return {"size": size, "sha256": digest.hexdigest()}
+
+    def _changed(self, name: str) -> bool:
+        stat = os.stat(os.path.join(self.workdir, name))
+        entry = self.manifest[name]
+        return (stat.st_mtime_ns, stat.st_size) != (entry["mtime_ns"], entry["size"])
@@ -0,0 +1,119 @@
+"""
+Map-reduce summarization of scraped pages with one shared LLM client.
+
+Every chunk of a page is summarized on a bounded thread pool (map), then the
+chunk summaries are merged into a single summary (reduce). Summaries that are
+too long to merge in one call are merged in groups, level by level, so a page
+of any size ends up as one summary after a few rounds of parallel calls.
+"""
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence
+
+from tools.summary_store import SummaryStore, summary_key
+
+RESEARCHER = (
+    "You're a Principal Researcher at a big company and you need to do a "
+    "research about a given topic. Do amazing researches and summaries based "
+    "on the content you are working with.\n\n"
+)
+
+MAP_PROMPT = RESEARCHER + (
+    "Analyze and summarize the content bellow, make sure to include the most "
+    "relevant information in the summary, return only the summary nothing else."
+    "\n\nCONTENT\n----------\n{content}"
+)
+
+REDUCE_PROMPT = RESEARCHER + (
+    "The summaries bellow are consecutive parts of the same web page. Combine "
+    "them into a single summary, make sure to keep all the relevant information "
+    "and drop repetitions, return only the summary nothing else."
+    "\n\nSUMMARIES\n----------\n{content}"
+)
+
+DEFAULT_MAX_WORKERS = int(os.environ.get("SCRAPE_SUMMARY_WORKERS", 8))
+
+
+class MapReduceSummarizer():
+    """Summarizes text chunks with at most ``max_workers`` LLM calls in flight.
+
+    ``complete`` sends one prompt to the LLM and returns its text answer; the
+    same client is used for every call. ``model`` names that LLM; together
+    with the prompts it makes up ``key``, which identifies the summaries this
+    summarizer produces (e.g. in the page cache). With a ``store``, every
+    chunk (and every group of summaries) is only sent to the LLM if the same
+    model has not summarized it with the same prompt before.
+    """
+
+    def __init__(
+        self,
+        complete: Callable[[str], str],
+        max_workers: Optional[int] = None,
+        map_prompt: str = MAP_PROMPT,
+        reduce_prompt: str = REDUCE_PROMPT,
+        max_chars: int = 8000,
+        model: str = "",
+        store: Optional[SummaryStore] = None,
+    ):
+        self.complete = complete
+        self.model = model
+        self.store = store
+        self.max_workers = max_workers or DEFAULT_MAX_WORKERS
+        self.map_prompt = map_prompt
+        self.reduce_prompt = reduce_prompt
+        self.max_chars = max_chars
+
+    @property
+    def key(self) -> str:
+        recipe = "\0".join(
+            (self.model, self.map_prompt, self.reduce_prompt, str(self.max_chars))
+        )
+        return hashlib.sha256(recipe.encode("utf-8")).hexdigest()[:16]
+
+    def summarize(self, chunks: Sequence[str]) -> str:
+        chunks = [chunk for chunk in chunks if chunk.strip()]
+        if not chunks:
+            return ""
+        summaries = self._map(self.map_prompt, chunks)
+        while len(summaries) > 1:
+            groups = self._group(summaries)
+            summaries = self._map(
+                self.reduce_prompt, ["\n\n".join(group) for group in groups]
+            )
+        return summaries[0]
+
+    def _map(self, prompt: str, contents: List[str]) -> List[str]:
+        if len(contents) == 1:
+            return [self._complete(prompt, contents[0])]
+        with ThreadPoolExecutor(min(self.max_workers, len(contents))) as executor:
+            return list(
+                executor.map(lambda content: self._complete(prompt, content), contents)
+            )
+
+    def _complete(self, prompt: str, content: str) -> str:
+        if self.store is None:
+            return self.complete(prompt.format(content=content))
+        key = summary_key(self.model, prompt, content)
+        summary = self.store.get(key)
+        if summary is None:
+            summary = self.complete(prompt.format(content=content))
+            self.store.put(key, summary)
+        return summary
+
+    def _group(self, summaries: List[str]) -> List[List[str]]:
+        # Packs consecutive summaries up to max_chars, but always at least two
+        # per group, so every round at least halves the number of summaries.
+        groups: List[List[str]] = []
+        size = 0
+        for summary in summaries:
+            fits = size + len(summary) <= self.max_chars
+            if groups and (len(groups[-1]) < 2 or fits):
+                groups[-1].append(summary)
+                size += len(summary)
+            else:
+                groups.append([summary])
+                size = len(summary)
+        if len(groups) > 1 and len(groups[-1]) == 1:
+            groups[-2].extend(groups.pop())
+        return groups
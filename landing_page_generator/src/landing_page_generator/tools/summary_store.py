@@ -0,0 +1,127 @@
+"""
+Persistent memo of LLM summaries, keyed by what was summarized and how.
+
+A summary is stored under the hash of (model, prompt, content), so the same
+chunk summarized with the same prompt by the same model is never sent to the
+LLM twice, whichever page, crew or run it comes from. The store is a SQLite
+file shared by every crew on the machine and is trimmed to its size limits
+by evicting the least recently used summaries.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+DEFAULT_PATH = os.environ.get(
+    "SUMMARY_STORE_PATH",
+    os.path.join(
+        os.path.expanduser("~"), ".cache", "crewai-pages", "summaries.sqlite3"
+    ),
+)
+DEFAULT_MAX_ENTRIES = int(os.environ.get("SUMMARY_STORE_MAX_ENTRIES", 20000))
+DEFAULT_MAX_BYTES = int(os.environ.get("SUMMARY_STORE_MAX_BYTES", 100 * 2 ** 20))
+
+
+def summary_key(model: str, prompt: str, content: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model, prompt, content):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SummaryStore():
+    """LRU-bounded SQLite store of summaries, with this process's hit-rate counters."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def report(self) -> str:
+        return (
+            f"Summary store: {self.stats['hits']} hits, {self.stats['misses']} misses "
+            f"({self.hit_rate:.0%} hit rate), {self.stats['evictions']} evicted"
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            db = self._connect()
+            row = db.execute(
+                "SELECT summary FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            db.execute(
+                "UPDATE summaries SET used_at = ? WHERE key = ?", (time.time(), key)
+            )
+            db.commit()
+            return row[0]
+
+    def put(self, key: str, summary: str) -> None:
+        with self._lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, size, used_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, summary, len(summary.encode("utf-8")), time.time()),
+            )
+            self._evict(db)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        entries, size = db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summaries"
+        ).fetchone()
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return
+        # Trim to 90% of the limits, so the next inserts don't evict one by one.
+        max_entries, max_bytes = int(self.max_entries * 0.9), int(self.max_bytes * 0.9)
+        while entries > max_entries or size > max_bytes:
+            oldest = db.execute(
+                "SELECT key, size FROM summaries ORDER BY used_at LIMIT 256"
+            ).fetchall()
+            if not oldest:
+                break
+            for key, entry_size in oldest:
+                if entries <= max_entries and size <= max_bytes:
+                    break
+                db.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                entries -= 1
+                size -= entry_size
+                self.stats["evictions"] += 1
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                "key TEXT PRIMARY KEY, summary TEXT NOT NULL, "
+                "size INTEGER NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS summaries_used_at ON summaries (used_at)"
+            )
+            self._db.commit()
+        return self._db
+
+
+SUMMARY_STORE = SummaryStore()
@@ -0,0 +1,48 @@
+import json
+import os
+import sys
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "landing_page_generator"))
+
+from tools.packager import ProjectPackager  # noqa: E402
+
+
+def make_packager(tmp_path):
+    workdir = tmp_path / "workdir"
+    (workdir / "src").mkdir(parents=True)
+    (workdir / "index.html").write_text("<html></html>")
+    (workdir / "src" / "App.jsx").write_text("export default App")
+    archive = tmp_path / "workdir.zip"
+    return ProjectPackager(str(workdir), str(archive), templates=str(tmp_path / "templates")), workdir, archive
+
+
+def test_file_changed_after_packaging_rebuilds_the_archive(tmp_path, capsys):
+    packager, workdir, archive = make_packager(tmp_path)
+    packager.add(str(workdir / "src" / "App.jsx"))
+    app = workdir / "src" / "App.jsx"
+    app.write_text("export default function App() {}")
+    stat = app.stat()
+    os.utime(app, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    packager.finish()
+
+    assert "rebuilding the archive" in capsys.readouterr().out
+    with zipfile.ZipFile(archive) as zf:
+        assert zf.read("src/App.jsx") == b"export default function App() {}"
+        assert zf.read("index.html") == b"<html></html>"
+        manifest = json.loads(zf.read("manifest.json"))
+    assert set(manifest["files"]) == {"index.html", "src/App.jsx"}
+    assert not os.path.exists(f"{archive}.part")
+
+
+def test_abort_removes_the_partial_archive(tmp_path):
+    packager, workdir, archive = make_packager(tmp_path)
+    packager.add("index.html")
+    assert os.path.exists(f"{archive}.part")
+
+    packager.abort()
+
+    assert not os.path.exists(f"{archive}.part")
+    assert not archive.exists()
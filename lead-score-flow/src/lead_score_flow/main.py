@@ -1,6 +1,6 @@
 #!/usr/bin/env python
-import asyncio
-from typing import List
+import os
+from typing import Iterator, List
 
 from crewai.flow.flow import Flow, listen, or_, router, start
 from pydantic import BaseModel
@@ -8,45 +8,98 @@ from pydantic import BaseModel
 from lead_score_flow.constants import JOB_DESCRIPTION
 from lead_score_flow.crews.lead_response_crew.lead_response_crew import LeadResponseCrew
 from lead_score_flow.crews.lead_score_crew.lead_score_crew import LeadScoreCrew
-from lead_score_flow.types import Candidate, CandidateScore, ScoredCandidate
-from lead_score_flow.utils.candidateUtils import combine_candidates_with_scores
+from lead_score_flow.types import Candidate, ScoredCandidate
+from lead_score_flow.utils.candidateUtils import (
+    feedback_pattern,
+    is_exclusionary,
+    mentions_feedback,
+    score_cache_key,
+    scoring_version,
+)
+from lead_score_flow.utils.leadStore import LeadStore, read_candidates
+from lead_score_flow.utils.scoringScheduler import ScoringScheduler, estimate_tokens
+
+# Number of best candidates kept in the flow state (and re-scored on feedback)
+SHORTLIST_SIZE = int(os.environ.get("SCORING_RESCORE_TOP", 10))
 
 
 class LeadScoreState(BaseModel):
-    candidates: List[Candidate] = []
-    candidate_score: List[CandidateScore] = []
-    hydrated_candidates: List[ScoredCandidate] = []
+    # The candidates and all their scores are in the LeadStore (SQLite), so
+    # the state stays small however many leads there are.
+    lead_count: int = 0
+    scored_count: int = 0
+    hydrated_candidates: List[ScoredCandidate] = []  # the shortlist, best first
     scored_leads_feedback: str = ""
 
 
 class LeadScoreFlow(Flow[LeadScoreState]):
     initial_state = LeadScoreState
 
+    @property
+    def lead_store(self) -> LeadStore:
+        if getattr(self, "_lead_store", None) is None:
+            self._lead_store = LeadStore()
+        return self._lead_store
+
     @start()
     def load_leads(self):
-        import csv
         from pathlib import Path
 
         # Get the path to leads.csv in the same directory
         current_dir = Path(__file__).parent
         csv_file = current_dir / "leads.csv"
 
-        candidates = []
-        with open(csv_file, mode="r", newline="", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                # Create a Candidate object for each row
-                print("Row:", row)
-                candidate = Candidate(**row)
-                candidates.append(candidate)
-
-        # Update the state with the loaded candidates
-        self.state.candidates = candidates
+        # Stream the rows into the lead store, a chunk at a time
+        self.state.lead_count = self.lead_store.load(read_candidates(csv_file))
+        print(f"Loaded {self.state.lead_count} leads from {csv_file.name}")
 
     @listen(or_(load_leads, "scored_leads_feedback"))
     async def score_leads(self):
         print("Scoring leads")
-        tasks = []
+        store = self.lead_store
+        feedback = self.state.scored_leads_feedback
+        selected = lambda candidate: True
+        total = self.state.lead_count
+        if feedback and store.has_scores() and not is_exclusionary(feedback):
+            # Re-scoring with feedback: only the candidates it can affect, and
+            # the shortlist. Feedback that matches no one can affect anyone,
+            # and feedback ruling candidates out affects those it does not
+            # mention too.
+            pattern = feedback_pattern(feedback)
+            if pattern is not None and any(
+                mentions_feedback(candidate, pattern) for candidate in store.candidates()
+            ):
+                shortlist = {candidate.id for candidate in self.state.hydrated_candidates}
+                selected = lambda candidate: (
+                    candidate.id in shortlist or mentions_feedback(candidate, pattern)
+                )
+                total = sum(1 for candidate in store.candidates() if selected(candidate))
+
+        # At most SCORING_CONCURRENCY crews at once, within the provider's
+        # request and token rate limits (see ScoringScheduler.from_env).
+        scheduler = ScoringScheduler.from_env()
+        # Cached scores are only reused for the same model and prompts.
+        llm = LeadScoreCrew().crew().agents[0].llm
+        version = scoring_version(str(getattr(llm, "model", llm)))
+
+        def candidates_to_score() -> Iterator[Candidate]:
+            # Streamed from the store; scores for the same candidate, job and
+            # feedback are reused instead of being computed again.
+            for candidate in store.candidates():
+                if not selected(candidate):
+                    continue
+                key = score_cache_key(candidate, JOB_DESCRIPTION, feedback, version)
+                cached = store.cached_score(key)
+                if cached is not None:
+                    store.save_score(candidate.id, cached)
+                    scheduler.reuse()
+                else:
+                    yield candidate
+
+        def cost(candidate: Candidate) -> int:
+            return estimate_tokens(
+                candidate.bio, JOB_DESCRIPTION, self.state.scored_leads_feedback
+            )
 
         async def score_single_candidate(candidate: Candidate):
             result = await (
@@ -63,29 +116,34 @@ class LeadScoreFlow(Flow[LeadScoreState]):
                 )
             )
 
-            self.state.candidate_score.append(result.pydantic)
+            return result.pydantic
 
-        for candidate in self.state.candidates:
-            print("Scoring candidate:", candidate.name)
-            task = asyncio.create_task(score_single_candidate(candidate))
-            tasks.append(task)
+        def save(candidate: Candidate, score):
+            if score is not None:
+                key = score_cache_key(candidate, JOB_DESCRIPTION, feedback, version)
+                store.save_score(candidate.id, score, key)
 
-        candidate_scores = await asyncio.gather(*tasks)
-        print("Finished scoring leads: ", len(candidate_scores))
+        await scheduler.run(
+            candidates_to_score(),
+            score_single_candidate,
+            cost,
+            total=total,
+            on_result=save,
+        )
+        store.commit()
+        self.state.scored_count = store.scored_count()
+        print(
+            "Finished scoring leads: ",
+            scheduler.completed,
+            f"({scheduler.reused} from cache)",
+        )
 
     @router(score_leads)
     def human_in_the_loop(self):
         print("Finding the top 3 candidates for human to review")
 
-        # Combine candidates with their scores using the helper function
-        self.state.hydrated_candidates = combine_candidates_with_scores(
-            self.state.candidates, self.state.candidate_score
-        )
-
-        # Sort the scored candidates by their score in descending order
-        sorted_candidates = sorted(
-            self.state.hydrated_candidates, key=lambda c: c.score, reverse=True
-        )
+        # The best scored candidates, straight from the lead store
+        sorted_candidates = self.lead_store.top_candidates(SHORTLIST_SIZE)
         self.state.hydrated_candidates = sorted_candidates
 
         # Select the top 3 candidates
@@ -134,8 +192,6 @@ class LeadScoreFlow(Flow[LeadScoreState]):
             candidate.id for candidate in self.state.hydrated_candidates[:3]
         }
 
-        tasks = []
-
         # Create the directory 'email_responses' if it doesn't exist
         output_dir = Path(__file__).parent / "email_responses"
         print("output_dir:", output_dir)
@@ -162,7 +218,6 @@ class LeadScoreFlow(Flow[LeadScoreState]):
             # Sanitize the candidate's name to create a valid filename
             safe_name = re.sub(r"[^a-zA-Z0-9_\- ]", "", candidate.name)
             filename = f"{safe_name}.txt"
-            print("Filename:", filename)
 
             # Write the email content to a text file
             file_path = output_dir / filename
@@ -172,18 +227,24 @@ class LeadScoreFlow(Flow[LeadScoreState]):
             # Return a message indicating the email was saved
             return f"Email saved for {candidate.name} as {filename}"
 
-        # Create tasks for all candidates
-        for candidate in self.state.hydrated_candidates:
-            task = asyncio.create_task(write_email(candidate))
-            tasks.append(task)
-
-        # Run all email-writing tasks concurrently and collect results
-        email_results = await asyncio.gather(*tasks)
+        def report(candidate, message):
+            if message is not None:
+                print(message)
+
+        # Stream every scored candidate from the store through the same
+        # bounded, rate-limited scheduler as the scoring
+        scheduler = ScoringScheduler.from_env()
+        await scheduler.run(
+            self.lead_store.scored_candidates(),
+            write_email,
+            lambda candidate: estimate_tokens(candidate.bio),
+            total=self.state.scored_count,
+            on_result=report,
+            label="Emails written",
+        )
 
         # After all emails have been generated and saved
         print("\nAll emails have been written and saved to 'email_responses' folder.")
-        for message in email_results:
-            print(message)
 
 
 def kickoff():
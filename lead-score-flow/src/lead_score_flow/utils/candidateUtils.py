@@ -1,36 +1,91 @@
-from typing import List
-
-from lead_score_flow.types import Candidate, CandidateScore, ScoredCandidate
-
-
-def combine_candidates_with_scores(
-    candidates: List[Candidate], candidate_scores: List[CandidateScore]
-) -> List[ScoredCandidate]:
-    """
-    Combine the candidates with their scores using a dictionary for efficient lookups.
-    """
-    print("COMBINING CANDIDATES WITH SCORES")
-    print("SCORES:", candidate_scores)
-    print("CANDIDATES:", candidates)
-    # Create a dictionary to map score IDs to their corresponding CandidateScore objects
-    score_dict = {score.id: score for score in candidate_scores}
-    print("SCORE DICT:", score_dict)
-
-    scored_candidates = []
-    for candidate in candidates:
-        score = score_dict.get(candidate.id)
-        if score:
-            scored_candidates.append(
-                ScoredCandidate(
-                    id=candidate.id,
-                    name=candidate.name,
-                    email=candidate.email,
-                    bio=candidate.bio,
-                    skills=candidate.skills,
-                    score=score.score,
-                    reason=score.reason,
-                )
-            )
-
-    print("SCORED CANDIDATES:", scored_candidates)
-    return scored_candidates
+import hashlib
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Pattern
+
+from lead_score_flow.types import Candidate
+
+STOPWORDS = {
+    "an", "as", "at", "be", "by", "do", "if", "in", "is", "it", "me", "my", "no",
+    "of", "on", "or", "so", "to", "up", "us", "we", "about", "also", "and", "any", "are", "but", "can", "candidate", "candidates",
+    "for", "from", "has", "have", "into", "like", "looking", "more", "most", "must",
+    "not", "only", "our", "people", "please", "prefer", "should", "some", "that",
+    "the", "their", "them", "they", "this", "those", "want", "who", "with", "without",
+    "would", "you", "your",
+    # Words of any hiring feedback, that say nothing about who is affected
+    "able", "ability", "anyone", "background", "best", "better", "developer", "developers",
+    "engineer", "engineers", "experience", "experienced", "good", "great", "hire", "know",
+    "knowledge", "knows", "less", "need", "needs", "person", "really", "role", "skill",
+    "skilled", "skills", "solid", "someone", "strong", "stronger", "than", "very", "wants",
+    "well", "work", "working", "year", "years",
+}
+
+# Feedback that rules candidates out also changes the scores of those who do
+# not mention its keywords, so it re-scores everyone.
+EXCLUSIONARY = re.compile(
+    r"\b(exclude|excluding|without|no|not|don't|dont|never|only|must|reject|remove|avoid|lacks?|lacking|unless)\b",
+    re.IGNORECASE,
+)
+
+SCORE_CREW_CONFIG = Path(__file__).parent.parent / "crews" / "lead_score_crew" / "config"
+
+
+@lru_cache(maxsize=None)
+def scoring_version(model: str) -> str:
+    """
+    Version of the scoring: the model and the scoring crew's agent and task
+    configuration. Editing the prompts or switching models changes it, so
+    cached scores are not reused.
+    """
+    digest = hashlib.sha256(model.encode("utf-8"))
+    for config in sorted(SCORE_CREW_CONFIG.glob("*.yaml")):
+        digest.update(b"\0")
+        digest.update(config.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def score_cache_key(candidate: Candidate, job_description: str, feedback: str, version: str = "") -> str:
+    """
+    Key of a candidate's score: the same candidate scored for the same job
+    with the same feedback, by the same `scoring_version`, gets the same
+    score, so it is only scored once.
+    """
+    digest = hashlib.sha256()
+    for part in (candidate.id, candidate.name, candidate.bio, job_description, feedback, version):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def feedback_keywords(feedback: str) -> List[str]:
+    """
+    The words of the feedback that can be matched against a candidate, e.g.
+    "typescript", "next.js" or "c#", without stopwords and single letters.
+    """
+    words = re.findall(r"[a-z0-9][a-z0-9.+#-]*[a-z0-9+#]|[a-z0-9]", feedback.lower())
+    return list(dict.fromkeys(word for word in words if len(word) > 1 and word not in STOPWORDS))
+
+
+def feedback_pattern(feedback: str) -> Optional[Pattern]:
+    """
+    Regex matching the keywords of the feedback in a candidate's bio or
+    skills, or None if the feedback has no usable keyword.
+    """
+    keywords = feedback_keywords(feedback)
+    if not keywords:
+        return None
+    # Keywords match at the start of a word, so "typescript" also finds "TypeScripts".
+    return re.compile(
+        r"(?<![a-z0-9])(" + "|".join(re.escape(keyword) for keyword in keywords) + r")",
+        re.IGNORECASE,
+    )
+
+
+def is_exclusionary(feedback: str) -> bool:
+    """True for feedback that rules candidates out, e.g. "exclude candidates without Python"."""
+    return EXCLUSIONARY.search(feedback) is not None
+
+
+def mentions_feedback(candidate: Candidate, pattern: Pattern) -> bool:
+    return pattern.search(f"{candidate.bio}\n{candidate.skills}") is not None
@@ -0,0 +1,163 @@
+import csv
+import os
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from lead_score_flow.types import Candidate, CandidateScore, ScoredCandidate
+
+# The score cache, in the directory the flow is run from.
+DEFAULT_PATH = os.environ.get("LEAD_STORE_PATH", "lead_store.sqlite3")
+CHUNK_SIZE = int(os.environ.get("LEADS_CHUNK_SIZE", 1000))
+
+
+def read_candidates(csv_file: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[List[Candidate]]:
+    """
+    Stream the leads of a CSV export in chunks of `chunk_size` candidates,
+    without ever holding the whole file in memory.
+    """
+    with open(csv_file, mode="r", newline="", encoding="utf-8") as file:
+        chunk = []
+        for row in csv.DictReader(file):
+            chunk.append(Candidate(**row))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class LeadStore:
+    """
+    The candidates of a run and their scores, kept in SQLite instead of the
+    flow state, so memory stays flat however many leads there are.
+
+    - candidates: the leads loaded from the CSV, replaced on every load.
+    - current_scores: the score each candidate has now.
+    - scores: every score computed, by `score_cache_key`, kept across runs.
+
+    The first two belong to this run only: they live in a private temporary
+    database that SQLite deletes on close, so concurrent runs never clobber
+    each other. The scores are shared, in the SQLite file at `path`.
+
+    Writes are committed in batches of `commit_every`, and by `commit()`.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, commit_every: int = 500):
+        self.path = path
+        self.commit_every = commit_every
+        self._pending = 0
+        # An empty name opens a temporary database, spilled to disk when large.
+        self._db = sqlite3.connect("", timeout=30, check_same_thread=False)
+        self._db.execute("ATTACH DATABASE ? AS cache", (path,))
+        self._db.execute("PRAGMA cache.journal_mode=WAL")
+        self._db.execute("PRAGMA cache.synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS candidates (
+                position INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL,
+                name TEXT, email TEXT, bio TEXT, skills TEXT
+            );
+            CREATE TABLE IF NOT EXISTS cache.scores (
+                key TEXT PRIMARY KEY, id TEXT NOT NULL, score INTEGER NOT NULL, reason TEXT
+            );
+            CREATE TABLE IF NOT EXISTS current_scores (
+                id TEXT PRIMARY KEY, score INTEGER NOT NULL, reason TEXT
+            );
+            CREATE INDEX IF NOT EXISTS current_scores_score ON current_scores (score DESC);
+            """
+        )
+
+    def load(self, chunks: Iterable[List[Candidate]]) -> int:
+        """Replace the candidates with those of `chunks` and return how many there are."""
+        self._db.execute("DELETE FROM candidates")
+        self._db.execute("DELETE FROM current_scores")
+        for chunk in chunks:
+            # A lead exported twice keeps its first row, like the CSV order.
+            self._db.executemany(
+                "INSERT OR IGNORE INTO candidates (id, name, email, bio, skills) VALUES (?, ?, ?, ?, ?)",
+                [(c.id, c.name, c.email, c.bio, c.skills) for c in chunk],
+            )
+            self._db.commit()
+        return self.count()
+
+    def count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def has_scores(self) -> bool:
+        return self._db.execute("SELECT 1 FROM current_scores LIMIT 1").fetchone() is not None
+
+    def candidates(self, chunk_size: int = CHUNK_SIZE) -> Iterator[Candidate]:
+        """Stream the candidates in CSV order, reading `chunk_size` rows at a time."""
+        position = 0
+        while True:
+            rows = self._db.execute(
+                "SELECT position, id, name, email, bio, skills FROM candidates "
+                "WHERE position > ? ORDER BY position LIMIT ?",
+                (position, chunk_size),
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield Candidate(id=row[1], name=row[2], email=row[3], bio=row[4], skills=row[5])
+            position = rows[-1][0]
+
+    def scored_candidates(self, chunk_size: int = CHUNK_SIZE) -> Iterator[ScoredCandidate]:
+        """Stream the candidates that have a score, in CSV order."""
+        position = 0
+        while True:
+            rows = self._db.execute(
+                "SELECT c.position, c.id, c.name, c.email, c.bio, c.skills, s.score, s.reason "
+                "FROM candidates c JOIN current_scores s ON s.id = c.id "
+                "WHERE c.position > ? ORDER BY c.position LIMIT ?",
+                (position, chunk_size),
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield ScoredCandidate(
+                    id=row[1], name=row[2], email=row[3], bio=row[4], skills=row[5], score=row[6], reason=row[7]
+                )
+            position = rows[-1][0]
+
+    def cached_score(self, key: str) -> Optional[CandidateScore]:
+        row = self._db.execute("SELECT id, score, reason FROM cache.scores WHERE key = ?", (key,)).fetchone()
+        return CandidateScore(id=row[0], score=row[1], reason=row[2]) if row else None
+
+    def save_score(self, candidate_id: str, score: CandidateScore, key: Optional[str] = None):
+        """Make `score` the candidate's current score, and cache it under `key`."""
+        if key is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache.scores (key, id, score, reason) VALUES (?, ?, ?, ?)",
+                (key, candidate_id, score.score, score.reason),
+            )
+        self._db.execute(
+            "INSERT OR REPLACE INTO current_scores (id, score, reason) VALUES (?, ?, ?)",
+            (candidate_id, score.score, score.reason),
+        )
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        self._db.commit()
+        self._pending = 0
+
+    def scored_count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM current_scores").fetchone()[0]
+
+    def top_candidates(self, limit: int) -> List[ScoredCandidate]:
+        """The `limit` best scored candidates, best first."""
+        return [
+            ScoredCandidate(id=row[0], name=row[1], email=row[2], bio=row[3], skills=row[4], score=row[5], reason=row[6])
+            for row in self._db.execute(
+                "SELECT c.id, c.name, c.email, c.bio, c.skills, s.score, s.reason "
+                "FROM current_scores s JOIN candidates c ON c.id = s.id "
+                "ORDER BY s.score DESC, c.position LIMIT ?",
+                (limit,),
+            )
+        ]
+
+    def close(self):
+        self.commit()
+        self._db.close()
@@ -0,0 +1,193 @@
+import asyncio
+import os
+import random
+import time
+from typing import Awaitable, Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def estimate_tokens(*texts: str, completion_tokens: int = 400) -> int:
+    """
+    Rough token count of a request: about 4 characters per token for the
+    prompt texts, plus the expected size of the answer.
+    """
+    return sum(len(text) for text in texts) // 4 + completion_tokens
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True for provider rate limit errors (HTTP 429), whichever client raised them."""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    if type(error).__name__ == "RateLimitError":
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "ratelimit" in message
+
+
+class TokenBucket:
+    """
+    Allows `rate_per_minute` units per minute, in bursts of at most `capacity`
+    (by default, what the rate allows in 10 seconds: providers enforce their
+    per-minute limits over shorter windows too).
+
+    A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity or max(1.0, self.rate * 10)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1):
+        if self.rate <= 0:
+            return
+        # A request larger than the bucket still goes through, once it is full.
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class ScoringScheduler:
+    """
+    Runs one coroutine per item with bounded concurrency, within request and
+    token rate limits, retrying rate-limited items with jittered backoff.
+
+    When the provider answers 429 anyway, every worker pauses for the backoff
+    delay, so the whole batch slows down instead of hammering the quota.
+    Items that still fail are reported and returned as None.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_retries: int = 5,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+        progress_interval: float = 5.0,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.progress_interval = progress_interval
+        self.completed = 0
+        self.failed = 0
+        self.reused = 0
+        self.retries = 0
+        self._resume_at = 0.0
+
+    @classmethod
+    def from_env(cls) -> "ScoringScheduler":
+        """
+        Configure the scheduler from SCORING_CONCURRENCY (default 10),
+        SCORING_REQUESTS_PER_MINUTE and SCORING_TOKENS_PER_MINUTE (default 0,
+        no limit) and SCORING_MAX_RETRIES (default 5).
+        """
+        return cls(
+            max_concurrency=int(os.environ.get("SCORING_CONCURRENCY", 10)),
+            requests_per_minute=float(os.environ.get("SCORING_REQUESTS_PER_MINUTE", 0)),
+            tokens_per_minute=float(os.environ.get("SCORING_TOKENS_PER_MINUTE", 0)),
+            max_retries=int(os.environ.get("SCORING_MAX_RETRIES", 5)),
+        )
+
+    def reuse(self, count: int = 1):
+        """Count items whose earlier result was reused instead of running them, for the progress report."""
+        self.reused += count
+
+    async def run(
+        self,
+        items: Iterable[T],
+        work: Callable[[T], Awaitable[R]],
+        cost: Callable[[T], int] = lambda item: 0,
+        total: Optional[int] = None,
+        on_result: Optional[Callable[[T, Optional[R]], None]] = None,
+        label: str = "Scored",
+    ) -> List[Optional[R]]:
+        """
+        Run `work` on every item and return the results in the same order.
+
+        Args:
+            items: The items to process; consumed lazily, as workers free up,
+                so it can be a generator over more items than fit in memory.
+            work: Coroutine function processing one item.
+            cost: Estimated tokens used by one item, for the token rate limit.
+            total: Number of items for the progress report, if `items` has no len();
+                include the items passed to `reuse()` rather than to `run()`.
+            on_result: Called with every item and its result as soon as it is
+                done; the results are then not collected, and [] is returned.
+            label: What the progress report calls the processed items.
+        """
+        if total is None and hasattr(items, "__len__"):
+            total = len(items)
+        results: List[Optional[R]] = []
+        pending = enumerate(items)
+        started = time.monotonic()
+        last_report = started
+
+        async def worker():
+            nonlocal last_report
+            for index, item in pending:
+                result = await self._run_one(item, work, cost(item))
+                if on_result is not None:
+                    on_result(item, result)
+                else:
+                    results.extend([None] * (index + 1 - len(results)))
+                    results[index] = result
+                now = time.monotonic()
+                if now - last_report >= self.progress_interval:
+                    last_report = now
+                    self._report(label, total, started)
+
+        await asyncio.gather(*(worker() for _ in range(self.max_concurrency)))
+        if time.monotonic() > last_report:
+            self._report(label, total, started)
+        return results
+
+    async def _run_one(self, item: T, work: Callable[[T], Awaitable[R]], tokens: int) -> Optional[R]:
+        for attempt in range(self.max_retries + 1):
+            pause = self._resume_at - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            await self.requests.acquire(1)
+            await self.tokens.acquire(tokens)
+            try:
+                result = await work(item)
+                self.completed += 1
+                return result
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    print(f"Failed after {attempt + 1} attempt(s): {e}")
+                    self.failed += 1
+                    return None
+                # Jittered, so the workers that hit the limit together do not retry together.
+                delay = random.uniform(self.base_delay, min(self.max_delay, self.base_delay * 2 ** (attempt + 1)))
+                self._resume_at = max(self._resume_at, time.monotonic() + delay)
+                self.retries += 1
+                print(f"Rate limited, retrying in {delay:.1f}s (attempt {attempt + 2} of {self.max_retries + 1})")
+        return None
+
+    def _report(self, label: str, total: Optional[int], started: float):
+        elapsed = time.monotonic() - started
+        done = self.completed + self.failed + self.reused
+        rate = done / elapsed * 60 if elapsed > 0 else 0.0
+        progress = f"{done}/{total}" if total is not None else f"{done}"
+        reused = f"{self.reused} reused, " if self.reused else ""
+        line = f"{label} {progress} ({reused}{self.failed} failed, {self.retries} retries) in {elapsed:.0f}s, {rate:.0f}/min"
+        if total is not None and done and elapsed > 0:
+            line += f", ~{(total - done) / (done / elapsed):.0f}s left"
+        print(line)
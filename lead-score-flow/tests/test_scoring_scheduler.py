@@ -0,0 +1,22 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "lead_score_flow"))
+
+from utils.scoringScheduler import ScoringScheduler  # noqa: E402
+
+
+async def double(item):
+    return item * 2
+
+
+def test_reused_scores_count_towards_the_progress_total(capsys):
+    scheduler = ScoringScheduler(max_concurrency=2)
+    scheduler.reuse(2)
+
+    results = asyncio.run(scheduler.run([1, 2, 3], double, total=5))
+
+    assert results == [2, 4, 6]
+    report = capsys.readouterr().out.strip().splitlines()[-1]
+    assert report.startswith("Scored 5/5 (2 reused, 0 failed")
@@ -0,0 +1,57 @@
+"""
+Compares the calculator tool's safe evaluator against plain `eval`.
+
+Run from the stock_analysis directory: `python benchmarks/calculator_benchmark.py`
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "stock_analysis"))
+
+from tools.safe_math import _evaluate_cached, compile_expression, evaluate  # noqa: E402
+
+EXPRESSIONS = [
+    "200*7",
+    "5000/2*10",
+    "(574785 - 513983) / 513983 * 100",
+    "1.5e9 / 10.3e6",
+    "((3.2 + 4.8) * 12 - 7) ** 2 / 3",
+]
+
+QUARTERS = [127.4, 134.4, 143.1, 170.0, 143.3, 148.0, 158.9, 187.8, 155.7, 161.9, 170.7, 200.0]
+
+
+def bench(label, function, number):
+    seconds = timeit.timeit(function, number=number)
+    print(f"{label:<45} {seconds / number * 1e6:8.2f} us/call")
+
+
+def main(number: int = 20000):
+    print(f"{len(EXPRESSIONS)} expressions, {number} rounds each\n")
+    for expression in EXPRESSIONS:
+        assert abs(evaluate(expression) - eval(expression)) < 1e-9, expression
+
+    bench("eval (repeated expressions)", lambda: [eval(e) for e in EXPRESSIONS], number)
+    bench("evaluate (repeated expressions, memoized)", lambda: [evaluate(e) for e in EXPRESSIONS], number)
+
+    def cold():
+        _evaluate_cached.cache_clear()
+        return [evaluate(e) for e in EXPRESSIONS]
+    bench("evaluate (compiled, results not memoized)", cold, number)
+
+    def cold_compile():
+        compile_expression.cache_clear()
+        _evaluate_cached.cache_clear()
+        return [evaluate(e) for e in EXPRESSIONS]
+    bench("evaluate (nothing cached)", cold_compile, number // 10)
+
+    growth = "growth(" + str(QUARTERS) + ")"
+    bench("eval (12 quarter growth, list comprehension)",
+          lambda: eval("[(b - a) / a for a, b in zip(q, q[1:])]", {"q": QUARTERS}), number)
+    bench("evaluate (12 quarter growth, growth([...]))", lambda: evaluate(growth), number)
+    bench("evaluate (12 quarter growth, decimal mode)", lambda: evaluate(growth, True), number)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
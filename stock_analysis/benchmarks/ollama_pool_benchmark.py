@@ -0,0 +1,124 @@
+"""
+Measures LLM throughput against a mock Ollama server: one call at a time with a
+fresh connection per call (the old behavior) vs. the pooled client, with and
+without request de-duplication.
+
+By default every analysis has its own prompt, like a batch of distinct tickers,
+where de-duplication can not help. Pass `--distinct 5` to see what it saves
+when parallel crews repeat the same prompts.
+
+Run from the stock_analysis directory: `python benchmarks/ollama_pool_benchmark.py`
+Point it at a real server with `--url http://localhost:11434 --model llama3.1`.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "stock_analysis"))
+
+from llm_pool import OllamaConnectionPool, RequestDeduplicator  # noqa: E402
+
+
+def start_mock_server(latency: float, parallel: int, tokens: int):
+    """A stand-in for `ollama serve` that handles `parallel` requests at a time."""
+    slots = threading.BoundedSemaphore(parallel)
+    calls = {"count": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with slots:
+                calls["count"] += 1
+                time.sleep(latency)
+            body = json.dumps({
+                "model": payload["model"],
+                "message": {"role": "assistant", "content": "Final Answer: ok"},
+                "prompt_eval_count": 100,
+                "eval_count": tokens,
+                "done": True,
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, calls
+
+
+def payloads(model: str, analyses: int, distinct: int):
+    return [
+        {"model": model, "stream": False, "messages": [{"role": "user", "content": f"Analyze ticker #{i % distinct}"}]}
+        for i in range(analyses)
+    ]
+
+
+def report(label: str, seconds: float, results, server_calls):
+    tokens = sum(r.get("eval_count", 0) for r in results)
+    calls = f", {server_calls} server calls" if server_calls is not None else ""
+    print(f"{label:<38} {seconds:6.2f} s  {tokens / seconds:8.1f} tokens/s{calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="real Ollama server; a mock is started when omitted")
+    parser.add_argument("--model", default="llama3.1")
+    parser.add_argument("--analyses", type=int, default=20)
+    parser.add_argument("--distinct", type=int, help="distinct prompts among the analyses (default: all)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2, help="mock server seconds per request")
+    args = parser.parse_args()
+
+    calls = None
+    url = args.url
+    if url is None:
+        server, calls = start_mock_server(args.latency, args.concurrency, tokens=50)
+        url = f"http://127.0.0.1:{server.server_port}"
+
+    def server_calls():
+        if calls is None:
+            return None
+        count = calls["count"]
+        calls["count"] = 0
+        return count
+
+    distinct = args.distinct or args.analyses
+    work = payloads(args.model, args.analyses, distinct)
+    print(f"{args.analyses} analyses, {distinct} distinct prompts, concurrency {args.concurrency}\n")
+
+    start = time.perf_counter()
+    results = []
+    for payload in work:
+        response = requests.post(f"{url}/api/chat", json=payload, timeout=600)
+        results.append(response.json())
+    report("one call at a time, new connections", time.perf_counter() - start, results, server_calls())
+
+    pool = OllamaConnectionPool(url, max_concurrency=args.concurrency)
+    with ThreadPoolExecutor(args.analyses) as executor:
+        start = time.perf_counter()
+        results = list(executor.map(pool.chat, work))
+        report("pooled", time.perf_counter() - start, results, server_calls())
+
+        deduplicator = RequestDeduplicator(pool.chat, window=0.01)
+        start = time.perf_counter()
+        results = list(executor.map(deduplicator.submit, work))
+        report("pooled + de-duplication", time.perf_counter() - start, results, server_calls())
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Runs `StockAnalysisCrew().crew().kickoff()` end to end without network access
+and reports the wall time, call count and peak memory of every pipeline stage.
+
+SEC-API queries, filing downloads and XBRL documents are replayed from
+`benchmarks/fixtures/<TICKER>/`, the LLM is a mock Ollama server that answers
+with a fixed script (use each SEC tool once, then give the final answer), and
+filings are indexed by keyword overlap instead of OpenAI embeddings. Everything
+else (the filing cache, the HTML extraction, the crew, the pooled LLM client)
+is the real code.
+
+Run from the stock_analysis directory:
+
+    python benchmarks/pipeline_benchmark.py                      # all fixture tickers
+    python benchmarks/pipeline_benchmark.py --json current.json  # save the results
+    python benchmarks/pipeline_benchmark.py --baseline current.json --tolerance 0.25
+
+With `--baseline`, the script exits with status 1 if a stage got slower than
+the tolerance allows or is called more often than before. Peak memory is
+traced with tracemalloc, which slows allocation-heavy stages down, so compare
+results only with other results of this script. `--record AMZN` (needs
+SEC_API_API_KEY and network access) refreshes a ticker's fixtures from the
+live APIs.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+SOURCE_DIR = Path(__file__).resolve().parent.parent / "src" / "stock_analysis"
+
+# Each agent uses the SEC tools it has, in this order, then answers.
+SCRIPT = [
+    ("Search in the specified 10-Q form", {"search_query": "net sales and operating income", "section": "Item 2"}),
+    ("Search in the specified 10-Q form", {"search_query": "risk", "changes_only": True}),
+    ("Search in the specified 10-K form", {"search_query": "net sales increased", "section": "Item 7"}),
+    ("Search in the specified 10-K form", {"search_query": "risk factors"}),
+    ("Get exact financial facts from the latest 10-K and 10-Q", {"metrics": "revenue, operating income, operating margin, revenue growth"}),
+]
+
+
+def start_scripted_llm(latency: float):
+    """A stand-in for `ollama serve` whose replies only depend on the conversation so far."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(latency)
+            content = scripted_reply(payload["messages"])
+            prompt = sum(len(message["content"]) for message in payload["messages"])
+            body = json.dumps({
+                "model": payload["model"],
+                "message": {"role": "assistant", "content": content},
+                "prompt_eval_count": prompt // 4,
+                "eval_count": len(content) // 4,
+                "done": True,
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def scripted_reply(messages) -> str:
+    prompt = "\n".join(message["content"] for message in messages)
+    steps = [(tool, args) for tool, args in SCRIPT if tool in prompt]
+    # Every earlier action of this agent on this task left one assistant message behind.
+    taken = sum(1 for message in messages if message["role"] == "assistant")
+    if taken < len(steps):
+        tool, args = steps[taken]
+        return f"Thought: I should look this up.\nAction: {tool}\nAction Input: {json.dumps(args)}"
+    return "Thought: I now know the final answer\nFinal Answer: Scripted benchmark report."
+
+
+class Replay:
+    """Serves SEC-API and EDGAR responses from the fixtures, optionally with a simulated latency."""
+
+    def __init__(self, fixtures_dir: Path, latency: float = 0.0, scale: int = 1):
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.scale = scale
+        self.filings = {}
+        self.documents = {}
+        for ticker_dir in sorted(p for p in fixtures_dir.iterdir() if p.is_dir()):
+            for form_type, filings in json.loads((ticker_dir / "filings.json").read_text()).items():
+                self.filings[(ticker_dir.name, form_type)] = filings
+                for filing in filings:
+                    url = filing["linkToFilingDetails"]
+                    self.documents[url] = ticker_dir / url.rsplit("/", 1)[1]
+
+    def tickers(self):
+        return sorted({ticker for ticker, _ in self.filings})
+
+    def query_api(self, api_key=None):
+        return SimpleNamespace(get_filings=self.get_filings)
+
+    def xbrl_api(self, api_key=None):
+        return SimpleNamespace(xbrl_to_json=self.xbrl_to_json)
+
+    def get_filings(self, query):
+        time.sleep(self.latency)
+        match = re.search(r'ticker:(\S+) AND formType:"([^"]+)"', query["query"]["query_string"]["query"])
+        offset, size = int(query.get("from", 0)), int(query.get("size", 1))
+        filings = self.filings.get((match.group(1), match.group(2)), [])
+        return {"total": {"value": len(filings)}, "filings": filings[offset:offset + size]}
+
+    def xbrl_to_json(self, accession_no=None, **kwargs):
+        time.sleep(self.latency)
+        for path in self.fixtures_dir.glob(f"*/{accession_no}.xbrl.json"):
+            return json.loads(path.read_text())
+        raise ValueError(f"No XBRL fixture for {accession_no}")
+
+    def get(self, url, headers=None, stream=False, **kwargs):
+        time.sleep(self.latency)
+        return ReplayResponse(self.documents[url].read_bytes() * self.scale)
+
+
+class ReplayResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+
+def keyword_app_class(app_base):
+    """An embedchain App stand-in that ranks chunks by shared words, so indexing needs no embedding API."""
+
+    class KeywordApp(app_base):
+        def __init__(self):
+            self.documents = []
+
+        @classmethod
+        def from_config(cls, config=None, **kwargs):
+            return cls()
+
+        def add(self, source, data_type=None, metadata=None, **kwargs):
+            self.documents.append((source, metadata or {}, set(re.findall(r"\w+", source.lower()))))
+
+        def reset(self):
+            self.documents = []
+
+        def query(self, input_query, where=None, citations=False, dry_run=False, **kwargs):
+            words = set(re.findall(r"\w+", input_query.lower()))
+            matches = [
+                (len(words & tokens), source, metadata)
+                for source, metadata, tokens in self.documents
+                if not where or all(metadata.get(k) == v for k, v in where.items())
+            ]
+            matches.sort(key=lambda match: match[0], reverse=True)
+            sources = [(source, metadata) for _, source, metadata in matches[:3]]
+            answer = "\n\n".join(source for source, _ in sources)
+            return (answer, sources) if citations else answer
+
+    return KeywordApp
+
+
+def run_pipeline(tickers):
+    from crew import StockAnalysisCrew
+    from tools.profiling import PROFILER
+
+    tracemalloc.start()
+    PROFILER.reset()
+    start = time.perf_counter()
+    for ticker in tickers:
+        inputs = {
+            'query': 'What is the company you want to analyze?',
+            'company_stock': ticker,
+        }
+        StockAnalysisCrew(ticker).crew().kickoff(inputs=inputs)
+    total = time.perf_counter() - start
+    peak = PROFILER.traced_peak()
+    tracemalloc.stop()
+    return {"total_seconds": total, "peak_memory_mb": peak / 2 ** 20, "stages": PROFILER.snapshot()}
+
+
+def print_run(label: str, result):
+    print(f"\n{label}: {result['total_seconds']:.2f} s total, {result['peak_memory_mb']:.1f} MB peak (tracemalloc)")
+    for name, stage in sorted(result["stages"].items(), key=lambda item: -item[1]["seconds"]):
+        print(f"  {name:<18} {stage['seconds']:8.3f} s  {stage['calls']:5d} calls  "
+              f"{stage.get('peak_memory_mb', 0.0):7.1f} MB peak")
+
+
+def compare(baseline, current, tolerance: float, min_seconds: float = 0.05):
+    """Returns one line per regression between two runs of the same kind (cold or warm)."""
+    regressions = []
+    limit = baseline["total_seconds"] * (1 + tolerance)
+    if current["total_seconds"] > max(limit, min_seconds):
+        regressions.append(f"total: {baseline['total_seconds']:.3f} s -> {current['total_seconds']:.3f} s")
+    for name, stage in current["stages"].items():
+        before = baseline["stages"].get(name, {"seconds": 0.0, "calls": 0})
+        # Stages this short are timer noise; only their call counts are compared.
+        if stage["seconds"] > max(before["seconds"] * (1 + tolerance), min_seconds):
+            regressions.append(f"{name}: {before['seconds']:.3f} s -> {stage['seconds']:.3f} s")
+        if stage["calls"] > before["calls"]:
+            regressions.append(f"{name}: {before['calls']} -> {stage['calls']} calls")
+    return regressions
+
+
+def record(ticker: str, fixtures_dir: Path):
+    """Captures the latest 10-K and the two latest 10-Qs of ``ticker`` from the live APIs."""
+    import requests
+    from sec_api import QueryApi, XbrlApi
+    from tools.sec_tools import SEC_HEADERS
+
+    query_api = QueryApi(api_key=os.environ['SEC_API_API_KEY'])
+    xbrl_api = XbrlApi(api_key=os.environ['SEC_API_API_KEY'])
+    ticker_dir = fixtures_dir / ticker
+    ticker_dir.mkdir(parents=True, exist_ok=True)
+    index = {}
+    for form_type, count in (("10-K", 1), ("10-Q", 2)):
+        filings = query_api.get_filings({
+            "query": {"query_string": {"query": f"ticker:{ticker} AND formType:\"{form_type}\""}},
+            "from": "0",
+            "size": str(count),
+            "sort": [{"filedAt": {"order": "desc"}}],
+        })["filings"]
+        index[form_type] = filings
+        for filing in filings:
+            url = filing["linkToFilingDetails"]
+            response = requests.get(url, headers=SEC_HEADERS)
+            response.raise_for_status()
+            (ticker_dir / url.rsplit("/", 1)[1]).write_bytes(response.content)
+            xbrl = xbrl_api.xbrl_to_json(accession_no=filing["accessionNo"])
+            (ticker_dir / f"{filing['accessionNo']}.xbrl.json").write_text(json.dumps(xbrl))
+            print(f"Recorded {ticker} {form_type} {filing['accessionNo']}")
+    (ticker_dir / "filings.json").write_text(json.dumps(index, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("tickers", nargs="*", help="fixture tickers to analyze (default: all)")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--runs", type=int, default=2, help="the first run starts cold, later ones reuse its caches")
+    parser.add_argument("--scale", type=int, default=1, help="repeat each filing's HTML this many times")
+    parser.add_argument("--sec-latency", type=float, default=0.0, help="simulated seconds per SEC request")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated seconds per LLM call")
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    parser.add_argument("--baseline", type=Path, help="results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown per stage, 0.25 = 25%%")
+    parser.add_argument("--record", metavar="TICKER", help="refresh the fixtures of TICKER from the live APIs")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="stock-benchmark-")
+    server = start_scripted_llm(args.llm_latency)
+    # Set before the crew modules are imported, since they read these at import time.
+    os.environ.update({
+        "SEC_FILING_CACHE_DIR": os.path.join(workdir, "sec_filings"),
+        "SEC_INDEX_DIR": os.path.join(workdir, "sec_index"),
+        "SEC_MAX_REQUESTS_PER_SECOND": "1000000",
+        "OLLAMA_BASE_URL": f"http://127.0.0.1:{server.server_port}",
+        "OTEL_SDK_DISABLED": "true",
+        "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+        "CREWAI_STORAGE_DIR": os.path.join(workdir, "crewai"),
+    })
+    os.environ.setdefault("SEC_API_API_KEY", "replay")
+    sys.path.insert(0, str(SOURCE_DIR))
+
+    if args.record:
+        record(args.record.upper(), args.fixtures)
+        return
+
+    import tools.filing_index as filing_index
+    import tools.sec_tools as sec_tools
+
+    replay = Replay(args.fixtures, latency=args.sec_latency, scale=args.scale)
+    tickers = [ticker.upper() for ticker in args.tickers] or replay.tickers()
+    print(f"{len(tickers)} tickers ({', '.join(tickers)}), {args.runs} runs, cache in {workdir}")
+
+    results = []
+    with mock.patch.object(sec_tools, "QueryApi", replay.query_api), \
+            mock.patch.object(sec_tools, "XbrlApi", replay.xbrl_api), \
+            mock.patch.object(sec_tools, "requests", SimpleNamespace(get=replay.get)), \
+            mock.patch.object(filing_index, "App", keyword_app_class(filing_index.App)):
+        for run in range(args.runs):
+            result = run_pipeline(tickers)
+            results.append(result)
+            print_run("cold run" if run == 0 else f"warm run {run}", result)
+    server.shutdown()
+
+    report = {"tickers": tickers, "scale": args.scale, "runs": results}
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.json}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline["tickers"] != tickers or baseline["scale"] != args.scale:
+            sys.exit("The baseline was recorded with other tickers or another --scale.")
+        regressions = []
+        for run, (before, current) in enumerate(zip(baseline["runs"], results)):
+            label = "cold" if run == 0 else f"warm {run}"
+            regressions += [f"[{label}] {line}" for line in compare(before, current, args.tolerance)]
+        if regressions:
+            print("\nRegressions against the baseline:")
+            print("\n".join(f"  {line}" for line in regressions))
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,33 +3,59 @@ from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 
 from tools.calculator_tool import CalculatorTool
-from tools.sec_tools import SEC10KTool, SEC10QTool
+from tools.sec_tools import SEC10KTool, SEC10QTool, SECFinancialFactsTool
+from tools.tool_registry import LazyAdapter, ToolRegistry, default_rag_adapter
 
 from crewai_tools import WebsiteSearchTool, ScrapeWebsiteTool, TXTSearchTool
 
 from dotenv import load_dotenv
 load_dotenv()
 
-from langchain.llms import Ollama
-llm = Ollama(model="llama3.1")
+import os
+from llm import PooledOllama
+llm = PooledOllama(model="llama3.1", deduplicate=os.environ.get("OLLAMA_DEDUPLICATE") == "1")
 
 @CrewBase
 class StockAnalysisCrew:
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
-    
+
+    def __init__(self, stock_name: str = "AMZN"):
+        self.stock_name = stock_name
+        self.tool_registry = ToolRegistry()
+
+    def scrape_website_tool(self) -> ScrapeWebsiteTool:
+        return self.tool_registry.get("scrape_website", ScrapeWebsiteTool)
+
+    def website_search_tool(self) -> WebsiteSearchTool:
+        # Defer loading the embedding app until an agent actually searches a website.
+        return self.tool_registry.get("website_search", lambda: WebsiteSearchTool(adapter=LazyAdapter(factory=default_rag_adapter)))
+
+    def calculator_tool(self) -> CalculatorTool:
+        return self.tool_registry.get("calculator", CalculatorTool)
+
+    def sec_10q_tool(self) -> SEC10QTool:
+        return self.tool_registry.get("sec_10q", lambda: SEC10QTool(self.stock_name))
+
+    def sec_10k_tool(self) -> SEC10KTool:
+        return self.tool_registry.get("sec_10k", lambda: SEC10KTool(self.stock_name))
+
+    def financial_facts_tool(self) -> SECFinancialFactsTool:
+        return self.tool_registry.get("financial_facts", lambda: SECFinancialFactsTool(self.stock_name))
+
     @agent
-    def financial_agent(self) -> Agent:
+    def financial_analyst_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['financial_analyst'],
             verbose=True,
             llm=llm,
             tools=[
-                ScrapeWebsiteTool(),
-                WebsiteSearchTool(),
-                CalculatorTool(),
-                SEC10QTool("AMZN"),
-                SEC10KTool("AMZN"),
+                self.scrape_website_tool(),
+                self.website_search_tool(),
+                self.calculator_tool(),
+                self.sec_10q_tool(),
+                self.sec_10k_tool(),
+                self.financial_facts_tool(),
             ]
         )
     
@@ -37,7 +63,7 @@ class StockAnalysisCrew:
     def financial_analysis(self) -> Task: 
         return Task(
             config=self.tasks_config['financial_analysis'],
-            agent=self.financial_agent(),
+            agent=self.financial_analyst_agent(),
         )
     
 
@@ -48,10 +74,10 @@ class StockAnalysisCrew:
             verbose=True,
             llm=llm,
             tools=[
-                ScrapeWebsiteTool(),
-                # WebsiteSearchTool(), 
-                SEC10QTool("AMZN"),
-                SEC10KTool("AMZN"),
+                self.scrape_website_tool(),
+                # self.website_search_tool(),
+                self.sec_10q_tool(),
+                self.sec_10k_tool(),
             ]
         )
     
@@ -62,28 +88,6 @@ class StockAnalysisCrew:
             agent=self.research_analyst_agent(),
         )
     
-    @agent
-    def financial_analyst_agent(self) -> Agent:
-        return Agent(
-            config=self.agents_config['financial_analyst'],
-            verbose=True,
-            llm=llm,
-            tools=[
-                ScrapeWebsiteTool(),
-                WebsiteSearchTool(),
-                CalculatorTool(),
-                SEC10QTool(),
-                SEC10KTool(),
-            ]
-        )
-    
-    @task
-    def financial_analysis(self) -> Task: 
-        return Task(
-            config=self.tasks_config['financial_analysis'],
-            agent=self.financial_analyst_agent(),
-        )
-    
     @task
     def filings_analysis(self) -> Task:
         return Task(
@@ -98,9 +102,9 @@ class StockAnalysisCrew:
             verbose=True,
             llm=llm,
             tools=[
-                ScrapeWebsiteTool(),
-                WebsiteSearchTool(),
-                CalculatorTool(),
+                self.scrape_website_tool(),
+                self.website_search_tool(),
+                self.calculator_tool(),
             ]
         )
 
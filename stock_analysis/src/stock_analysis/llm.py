@@ -0,0 +1,85 @@
+import os
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from crewai import LLM
+from litellm import Usage
+
+from llm_pool import RequestDeduplicator, get_pool
+from tools.profiling import PROFILER
+
+
+class PooledOllama(LLM):
+    """Ollama LLM that talks to the server over a shared keep-alive connection pool.
+
+    Unlike the default LiteLLM path, which opens a fresh HTTP connection per
+    call, every instance pointing at the same server shares one pool capped at
+    ``max_concurrency`` in-flight requests. With ``deduplicate=True`` identical
+    concurrent prompts (e.g. parallel crews running the same task on the same
+    inputs) are sent to the server once; distinct prompts are unaffected.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        deduplicate: bool = False,
+        dedup_window: float = 0.0,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        stop: Optional[Union[str, List[str]]] = None,
+        max_tokens: Optional[int] = None,
+        seed: Optional[int] = None,
+        callbacks: List[Any] = None,
+        **kwargs,
+    ):
+        base_url = base_url or os.environ.get("OLLAMA_BASE_URL")
+        super().__init__(
+            model=f"ollama/{model}",
+            base_url=base_url,
+            temperature=temperature,
+            top_p=top_p,
+            stop=stop,
+            max_tokens=max_tokens,
+            seed=seed,
+            callbacks=callbacks or [],
+            **kwargs,
+        )
+        self.ollama_model = model
+        self.pool = get_pool(base_url, max_concurrency or int(os.environ.get("OLLAMA_MAX_CONCURRENCY", 4)))
+        self.deduplicator = RequestDeduplicator(self.pool.chat, dedup_window) if deduplicate else None
+
+    def call(self, messages: List[Dict[str, str]], callbacks: List[Any] = []) -> str:
+        options = {
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "stop": [self.stop] if isinstance(self.stop, str) else self.stop,
+            "num_predict": self.max_tokens or self.max_completion_tokens,
+            "seed": self.seed,
+        }
+        payload = {
+            "model": self.ollama_model,
+            "messages": messages,
+            "stream": False,
+            "options": {k: v for k, v in options.items() if v is not None},
+        }
+
+        start_time = time.time()
+        with PROFILER.stage("llm"):
+            response = self.deduplicator.submit(payload) if self.deduplicator else self.pool.chat(payload)
+        self._report_usage(response, callbacks or self.callbacks, start_time)
+        return response["message"]["content"]
+
+    def _report_usage(self, response: Dict[str, Any], callbacks: List[Any], start_time: float) -> None:
+        # This path bypasses LiteLLM, so feed the crew's token counters ourselves.
+        prompt_tokens = response.get("prompt_eval_count", 0)
+        completion_tokens = response.get("eval_count", 0)
+        usage = Usage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        )
+        for callback in callbacks:
+            if hasattr(callback, "log_success_event"):
+                callback.log_success_event({}, {"usage": usage}, start_time, time.time())
@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_OLLAMA_URL = "http://localhost:11434"
+
+
+class OllamaConnectionPool:
+    """Keep-alive HTTP connections to one Ollama server, with a cap on concurrent requests.
+
+    All LLM instances pointing at the same server share one pool (see
+    ``get_pool``), so parallel crews reuse warm connections instead of opening
+    a new one per call, and the server is never sent more than
+    ``max_concurrency`` requests at once.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_OLLAMA_URL, max_concurrency: int = 4, timeout: float = 600):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.requests_sent = 0
+        self._count_lock = threading.Lock()
+
+    def chat(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POSTs a non-streaming request to ``/api/chat`` and returns the decoded response."""
+        with self._slots:
+            with self._count_lock:
+                self.requests_sent += 1
+            response = self.session.post(f"{self.base_url}/api/chat", json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class RequestDeduplicator:
+    """Sends byte-identical concurrent requests to the server once.
+
+    This is de-duplication, not batching: Ollama's chat endpoint takes one
+    conversation per request, so distinct prompts (e.g. different tickers) are
+    still sent one by one and gain nothing. It only helps when parallel crews
+    send the very same payload (same agent, same task, same inputs). The first
+    caller of a payload becomes the leader and waits ``window`` seconds for
+    others to join; everyone who asks for the same payload while it is in
+    flight gets the leader's response.
+    """
+
+    def __init__(self, send: Callable[[Dict[str, Any]], Dict[str, Any]], window: float = 0.0):
+        self.send = send
+        self.window = window
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.deduplicated = 0
+
+    def submit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        key = json.dumps(payload, sort_keys=True)
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.deduplicated += 1
+
+        if leader:
+            if self.window:
+                time.sleep(self.window)
+            try:
+                future.set_result(self.send(payload))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    del self._in_flight[key]
+        return future.result()
+
+
+_pools: Dict[str, OllamaConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(base_url: Optional[str] = None, max_concurrency: int = 4) -> OllamaConnectionPool:
+    """Returns the process-wide pool for ``base_url``, creating it on first use."""
+    base_url = (base_url or DEFAULT_OLLAMA_URL).rstrip("/")
+    with _pools_lock:
+        pool = _pools.get(base_url)
+        if pool is None:
+            pool = _pools[base_url] = OllamaConnectionPool(base_url, max_concurrency=max_concurrency)
+        return pool
@@ -1,12 +1,86 @@
+import asyncio
+import os
 import sys
+from pathlib import Path
+from typing import Dict, List
+
 from crew import StockAnalysisCrew
+from tools.filing_fetcher import prefetch_filings
 
 def run():
     inputs = {
         'query': 'What is the company you want to analyze?',
         'company_stock': 'AMZN',
     }
-    return StockAnalysisCrew().crew().kickoff(inputs=inputs)
+    stock_crew = StockAnalysisCrew()
+    result = stock_crew.crew().kickoff(inputs=inputs)
+    print(stock_crew.tool_registry.report())
+    return result
+
+def load_tickers(args: List[str]) -> List[str]:
+    """
+    Reads tickers from the command line; an argument that is a file is read as a
+    watchlist with one ticker per line (blank lines and # comments are ignored).
+    """
+    tickers = []
+    for arg in args:
+        if os.path.isfile(arg):
+            for line in Path(arg).read_text().splitlines():
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    tickers.append(line.upper())
+        else:
+            tickers.append(arg.upper())
+    # Keep the watchlist order but analyse every ticker only once.
+    return list(dict.fromkeys(tickers))
+
+async def analyze_tickers(tickers: List[str], max_concurrency: int) -> Dict[str, object]:
+    """
+    Runs one crew per ticker, at most `max_concurrency` at a time. Each ticker
+    gets its own crew instance, and a failing ticker does not stop the others.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def analyze(ticker: str):
+        async with semaphore:
+            inputs = {
+                'query': 'What is the company you want to analyze?',
+                'company_stock': ticker,
+            }
+            try:
+                return await StockAnalysisCrew(ticker).crew().kickoff_async(inputs=inputs)
+            except Exception as e:
+                print(f"## Analysis of {ticker} failed: {e}")
+                return e
+
+    results = await asyncio.gather(*(analyze(ticker) for ticker in tickers))
+    return dict(zip(tickers, results))
+
+def run_batch():
+    """
+    Analyze every ticker given on the command line or in a watchlist file,
+    e.g. `batch AMZN MSFT` or `batch watchlist.txt`.
+    """
+    tickers = load_tickers(sys.argv[1:])
+    if not tickers:
+        raise Exception("Pass one or more tickers or a watchlist file to analyze.")
+
+    max_concurrency = int(os.environ.get('STOCK_BATCH_CONCURRENCY', 4))
+    reports_dir = Path(os.environ.get('STOCK_BATCH_REPORTS_DIR', 'reports'))
+
+    # Fetch and index all filings up front so the crews start from a warm cache.
+    prefetch_filings(tickers, max_workers=max_concurrency)
+    results = asyncio.run(analyze_tickers(tickers, max_concurrency))
+
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    for ticker, result in results.items():
+        if not isinstance(result, Exception):
+            (reports_dir / f"{ticker}.md").write_text(str(result))
+    failed = [ticker for ticker, result in results.items() if isinstance(result, Exception)]
+    print(f"## Analyzed {len(tickers) - len(failed)}/{len(tickers)} tickers, reports in {reports_dir}")
+    if failed:
+        print(f"## Failed: {', '.join(failed)}")
+    return results
 
 def train():
     """
@@ -21,8 +95,14 @@ def train():
 
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
-    
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        print("## Welcome to Stock Analysis Crew (batch mode)")
+        print('-------------------------------')
+        run_batch()
+        sys.exit(0)
+
     print("## Welcome to Stock Analysis Crew")
     print('-------------------------------')
     result = run()
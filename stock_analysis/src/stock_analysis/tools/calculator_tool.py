@@ -1,12 +1,18 @@
 from crewai_tools import BaseTool
 
+from tools.safe_math import ExpressionError, evaluate
+
 
 class CalculatorTool(BaseTool):
     name: str = "Calculator tool"
     description: str = (
-        "Useful to perform any mathematical calculations, like sum, minus, multiplication, division, etc. The input to this tool should be a mathematical  expression, a couple examples are `200*7` or `5000/2*10."
+        "Useful to perform any mathematical calculations, like sum, minus, multiplication, division, etc. The input to this tool should be a mathematical  expression, a couple examples are `200*7` or `5000/2*10. "
+        "Lists are computed element-wise, e.g. `[120, 130] / [100, 110] - 1`, and `sum`, `mean`, `min`, `max`, `growth` (period-over-period growth) and `cagr` work on lists, e.g. `growth([10, 12, 15])`."
     )
+    use_decimal: bool = False
 
     def _run(self, operation: str) -> int:
-        # Implementation goes here
-        return eval(operation)
+        try:
+            return evaluate(operation, self.use_decimal)
+        except ExpressionError as e:
+            return f"Error: {e}"
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+from tools.filing_parser import FilingChunk, iter_filing_chunks
+
+DEFAULT_CACHE_DIR = os.environ.get("SEC_FILING_CACHE_DIR", "db/sec_filings")
+# How long a cached "latest filing" answer is trusted before asking SEC-API
+# whether a newer filing is available.
+DEFAULT_TTL_SECONDS = int(os.environ.get("SEC_FILING_CACHE_TTL", 6 * 60 * 60))
+
+
+@dataclass
+class CachedFiling:
+    """A filing stored in the cache, with its raw HTML and extracted sections."""
+    ticker: str
+    form_type: str
+    accession_no: str
+    filed_at: str
+    url: str
+    sha256: str
+    html_path: Path
+    sections_path: Path
+
+    def iter_chunks(self) -> Iterator[FilingChunk]:
+        """Yields the section-tagged text chunks without loading the whole filing."""
+        with open(self.sections_path, encoding="utf-8") as f:
+            for line in f:
+                yield FilingChunk(**json.loads(line))
+
+    def text(self) -> str:
+        return "\n\n".join(chunk.text for chunk in self.iter_chunks())
+
+
+class FilingCache:
+    """Content-addressed on-disk cache of SEC filings.
+
+    Filing bodies and their extracted sections (one JSON chunk per line) are
+    stored once under ``objects/`` by the sha256 of the raw HTML;
+    ``<TICKER>/<FORM>/<accession>.json`` points at them, and
+    ``<TICKER>/<FORM>/latest.json`` remembers the most recent accession seen
+    together with the time it was last revalidated against SEC-API.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, ttl: int = DEFAULT_TTL_SECONDS):
+        self.root = Path(root)
+        self.ttl = ttl
+
+    def latest(self, ticker: str, form_type: str) -> Optional[CachedFiling]:
+        """Returns the latest cached filing, fresh or not."""
+        pointer = self._read_json(self._filing_dir(ticker, form_type) / "latest.json")
+        if pointer is None:
+            return None
+        return self.get(ticker, form_type, pointer["accession_no"])
+
+    def is_fresh(self, ticker: str, form_type: str) -> bool:
+        """True if the latest pointer was revalidated within the TTL."""
+        pointer = self._read_json(self._filing_dir(ticker, form_type) / "latest.json")
+        if pointer is None:
+            return False
+        return time.time() - pointer.get("checked_at", 0) < self.ttl
+
+    def get(self, ticker: str, form_type: str, accession_no: str) -> Optional[CachedFiling]:
+        meta = self._read_json(self._filing_dir(ticker, form_type) / f"{accession_no}.json")
+        if meta is None:
+            return None
+        filing = self._to_filing(meta)
+        if not filing.html_path.exists() or not filing.sections_path.exists():
+            return None
+        return filing
+
+    def put(
+        self,
+        ticker: str,
+        form_type: str,
+        filing: dict,
+        raw_chunks: Iterable[bytes],
+        extract: Callable[[Iterable[bytes]], Iterable[FilingChunk]] = iter_filing_chunks,
+        latest: bool = True,
+    ) -> CachedFiling:
+        """Stores a freshly downloaded filing and, unless ``latest`` is False, marks it as the latest one.
+
+        The raw HTML is written to disk as ``raw_chunks`` are consumed by
+        ``extract``, and the extracted chunks are written as they are produced,
+        so neither the HTML nor the text is ever held in memory whole.
+        """
+        digest = hashlib.sha256()
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        html_tmp = tmp_dir / f"{os.getpid()}-{time.time_ns()}.html"
+        sections_tmp = html_tmp.with_suffix(".jsonl")
+        try:
+            with open(html_tmp, "wb") as html_out, open(sections_tmp, "w", encoding="utf-8") as sections_out:
+                def tee() -> Iterator[bytes]:
+                    for raw in raw_chunks:
+                        digest.update(raw)
+                        html_out.write(raw)
+                        yield raw
+
+                for chunk in extract(tee()):
+                    sections_out.write(json.dumps(asdict(chunk)) + "\n")
+            sha256 = digest.hexdigest()
+            html_path = self._object_path(sha256, "html")
+            sections_path = self._object_path(sha256, "jsonl")
+            html_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(html_tmp, html_path)
+            os.replace(sections_tmp, sections_path)
+        finally:
+            html_tmp.unlink(missing_ok=True)
+            sections_tmp.unlink(missing_ok=True)
+
+        meta = {
+            "ticker": ticker.upper(),
+            "form_type": form_type,
+            "accession_no": filing["accessionNo"],
+            "filed_at": filing.get("filedAt", ""),
+            "url": filing.get("linkToFilingDetails", ""),
+            "sha256": sha256,
+        }
+        filing_dir = self._filing_dir(ticker, form_type)
+        self._write_atomic(filing_dir / f"{meta['accession_no']}.json", json.dumps(meta).encode("utf-8"))
+        if latest:
+            self.mark_checked(ticker, form_type, meta["accession_no"])
+        return self._to_filing(meta)
+
+    def get_xbrl(self, filing: CachedFiling) -> Optional[dict]:
+        """Returns the cached XBRL-to-JSON document of a filing, if any."""
+        return self._read_json(self._filing_dir(filing.ticker, filing.form_type) / f"{filing.accession_no}.xbrl.json")
+
+    def put_xbrl(self, filing: CachedFiling, data: dict) -> None:
+        self._write_atomic(
+            self._filing_dir(filing.ticker, filing.form_type) / f"{filing.accession_no}.xbrl.json",
+            json.dumps(data).encode("utf-8"),
+        )
+
+    def previous(self, filing: CachedFiling) -> Optional[CachedFiling]:
+        """Returns the most recent cached filing of the same ticker and form filed before ``filing``."""
+        candidates = []
+        for path in self._filing_dir(filing.ticker, filing.form_type).glob("*.json"):
+            meta = self._read_json(path)
+            if meta and "sha256" in meta and meta["filed_at"] < filing.filed_at:
+                candidates.append(meta)
+        for meta in sorted(candidates, key=lambda m: m["filed_at"], reverse=True):
+            cached = self.get(filing.ticker, filing.form_type, meta["accession_no"])
+            if cached is not None:
+                return cached
+        return None
+
+    def diff_path(self, previous: CachedFiling, current: CachedFiling) -> Path:
+        """Where the paragraphs of ``current`` that are not in ``previous`` are stored."""
+        return self._filing_dir(current.ticker, current.form_type) / f"{current.accession_no}.since-{previous.accession_no}.jsonl"
+
+    def mark_checked(self, ticker: str, form_type: str, accession_no: str) -> None:
+        """Records that ``accession_no`` is still the latest filing as of now."""
+        pointer = {"accession_no": accession_no, "checked_at": time.time()}
+        self._write_atomic(
+            self._filing_dir(ticker, form_type) / "latest.json",
+            json.dumps(pointer).encode("utf-8"),
+        )
+
+    def _to_filing(self, meta: dict) -> CachedFiling:
+        return CachedFiling(
+            ticker=meta["ticker"],
+            form_type=meta["form_type"],
+            accession_no=meta["accession_no"],
+            filed_at=meta["filed_at"],
+            url=meta["url"],
+            sha256=meta["sha256"],
+            html_path=self._object_path(meta["sha256"], "html"),
+            sections_path=self._object_path(meta["sha256"], "jsonl"),
+        )
+
+    def _filing_dir(self, ticker: str, form_type: str) -> Path:
+        return self.root / ticker.upper() / form_type
+
+    def _object_path(self, sha256: str, suffix: str) -> Path:
+        return self.root / "objects" / sha256[:2] / f"{sha256}.{suffix}"
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[dict]:
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
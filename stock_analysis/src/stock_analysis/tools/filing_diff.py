@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator, Set
+
+from tools.filing_cache import CachedFiling, FilingCache
+from tools.filing_parser import FilingChunk
+
+
+@dataclass
+class FilingDiff:
+    """The paragraphs of a filing that are new or modified since the previous one.
+
+    It has the same ``ticker``/``form_type``/``accession_no``/``sha256``/
+    ``iter_chunks`` surface as ``CachedFiling``, so it can be indexed and
+    queried exactly like a filing.
+    """
+    previous: CachedFiling
+    current: CachedFiling
+    path: Path
+
+    @property
+    def ticker(self) -> str:
+        return self.current.ticker
+
+    @property
+    def form_type(self) -> str:
+        return self.current.form_type
+
+    @property
+    def accession_no(self) -> str:
+        return f"{self.current.accession_no}-since-{self.previous.accession_no}"
+
+    @property
+    def sha256(self) -> str:
+        return hashlib.sha256(f"{self.previous.sha256}:{self.current.sha256}".encode()).hexdigest()
+
+    def iter_chunks(self) -> Iterator[FilingChunk]:
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                yield FilingChunk(**json.loads(line))
+
+
+def _fingerprint(paragraph: str) -> bytes:
+    # Whitespace and case changes alone do not count as a change.
+    return hashlib.blake2b(" ".join(paragraph.split()).lower().encode("utf-8"), digest_size=16).digest()
+
+
+def iter_changed_chunks(previous: CachedFiling, current: CachedFiling) -> Iterator[FilingChunk]:
+    """Yields, per item, the paragraphs and table rows of ``current`` that ``previous`` does not contain.
+
+    Only 16-byte fingerprints of the previous filing are kept in memory, and
+    the current filing is streamed, so this is cheap even for large filings.
+    A paragraph that merely moved to another item is not reported.
+    """
+    seen: Set[bytes] = set()
+    previous_sections: Set[str] = set()
+    for chunk in previous.iter_chunks():
+        previous_sections.add(chunk.section)
+        seen.update(_fingerprint(paragraph) for paragraph in chunk.text.split("\n"))
+
+    for chunk in current.iter_chunks():
+        changed = [paragraph for paragraph in chunk.text.split("\n") if _fingerprint(paragraph) not in seen]
+        if changed:
+            yield FilingChunk(
+                section=chunk.section,
+                title=chunk.title,
+                part=chunk.part,
+                text="\n".join(changed),
+                status="modified" if chunk.section in previous_sections else "new",
+            )
+
+
+def diff_filings(previous: CachedFiling, current: CachedFiling, cache: FilingCache) -> FilingDiff:
+    """Computes the section diff between two filings once and stores it next to the current filing."""
+    path = cache.diff_path(previous, current)
+    if not path.exists():
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for chunk in iter_changed_chunks(previous, current):
+                f.write(json.dumps(asdict(chunk)) + "\n")
+        os.replace(tmp, path)
+    return FilingDiff(previous=previous, current=current, path=path)
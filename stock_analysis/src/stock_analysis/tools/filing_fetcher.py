@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Optional, Tuple
+
+from tools.filing_cache import CachedFiling
+from tools.filing_index import get_filing_adapter
+from tools.sec_tools import fetch_latest_filing, fetch_xbrl
+
+FORM_TYPES = ("10-K", "10-Q")
+
+
+def prefetch_filings(
+    tickers: Iterable[str],
+    form_types: Tuple[str, ...] = FORM_TYPES,
+    max_workers: int = 4,
+    index: bool = True,
+) -> Dict[str, Dict[str, Optional[CachedFiling]]]:
+    """Downloads (and optionally embeds) the latest filings and XBRL data of every ticker with a bounded thread pool.
+
+    Requests to SEC go through the process-wide rate limiter in ``sec_tools``,
+    so ``max_workers`` only bounds how many filings are parsed and embedded at
+    the same time. Failures are isolated per ticker and form: they show up as
+    ``None`` in the result, and the crews fall back to their own fetch.
+    """
+    results: Dict[str, Dict[str, Optional[CachedFiling]]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        for ticker in tickers:
+            results[ticker] = {}
+            for form_type in form_types:
+                futures[pool.submit(_fetch, ticker, form_type, index)] = (ticker, form_type)
+
+        for future in as_completed(futures):
+            ticker, form_type = futures[future]
+            try:
+                results[ticker][form_type] = future.result()
+            except Exception as e:
+                print(f"Error prefetching {form_type} for {ticker}: {e}")
+                results[ticker][form_type] = None
+    return results
+
+
+def _fetch(ticker: str, form_type: str, index: bool) -> Optional[CachedFiling]:
+    filing = fetch_latest_filing(ticker, form_type)
+    if filing is not None:
+        fetch_xbrl(filing)
+        if index:
+            get_filing_adapter(filing)
+    return filing
@@ -0,0 +1,92 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from crewai_tools.adapters.embedchain_adapter import EmbedchainAdapter
+from embedchain import App
+from embedchain.models.data_type import DataType
+
+from tools.filing_cache import CachedFiling
+from tools.profiling import PROFILER
+
+DEFAULT_INDEX_DIR = os.environ.get("SEC_INDEX_DIR", "db/sec_index")
+# Bumped whenever the way filings are split or tagged changes, so old indexes get rebuilt.
+INDEX_VERSION = "sections-v1"
+
+_adapters: Dict[Tuple[str, str, str], EmbedchainAdapter] = {}
+_key_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+_adapters_lock = threading.Lock()
+
+
+def get_filing_adapter(filing: CachedFiling, summarize: bool = False, index_dir: str = DEFAULT_INDEX_DIR) -> EmbedchainAdapter:
+    """Returns the shared vector index for ``filing`` (or a ``FilingDiff``), embedding it only if needed.
+
+    Every (ticker, form, accession) gets its own persistent Chroma collection.
+    The sha256 of the embedded filing is written next to the collection, so
+    later processes attach to the existing index instead of re-embedding, and
+    later tool instances in the same process reuse the very same adapter.
+    """
+    key = (filing.ticker, filing.form_type, filing.accession_no)
+    # One lock per filing, so different filings can be embedded concurrently.
+    with _adapters_lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        adapter = _adapters.get(key)
+        if adapter is not None:
+            return adapter
+
+        path = Path(index_dir) / filing.ticker / filing.form_type / filing.accession_no
+        path.mkdir(parents=True, exist_ok=True)
+        app = App.from_config(config={
+            "app": {"config": {"id": _collection_name(filing)}},
+            "vectordb": {
+                "provider": "chromadb",
+                "config": {
+                    "collection_name": _collection_name(filing),
+                    "dir": str(path),
+                    "allow_reset": True,
+                },
+            },
+        })
+        adapter = EmbedchainAdapter(embedchain_app=app, summarize=summarize)
+
+        marker = path / "content.sha256"
+        expected = f"{filing.sha256}:{INDEX_VERSION}"
+        embedded = marker.read_text().strip() if marker.exists() else None
+        if embedded != expected:
+            if embedded is not None:
+                app.reset()
+            with PROFILER.stage("embedding"):
+                for chunk in filing.iter_chunks():
+                    adapter.add(
+                        chunk.text,
+                        data_type=DataType.TEXT,
+                        metadata={"section": chunk.section, "part": chunk.part},
+                    )
+            marker.write_text(expected)
+
+        _adapters[key] = adapter
+        return adapter
+
+
+def query_filing(adapter: EmbedchainAdapter, question: str, section: Optional[str] = None) -> str:
+    """Queries a filing index, optionally restricted to one SEC item (e.g. ``"Item 7"``)."""
+    where = {"section": section} if section else None
+    result, sources = adapter.embedchain_app.query(
+        question, where=where, citations=True, dry_run=(not adapter.summarize)
+    )
+    # Same output as EmbedchainAdapter.query: the answer, or the matching chunks.
+    if adapter.summarize:
+        return result
+    return "\n\n".join([source[0] for source in sources])
+
+
+def _collection_name(filing: CachedFiling) -> str:
+    # Chroma only accepts [a-zA-Z0-9_-], 3 to 63 characters.
+    name = f"sec-{filing.ticker}-{filing.form_type}-{filing.accession_no}".lower()
+    name = "".join(c if c.isalnum() or c in "-_" else "-" for c in name)
+    if len(name) > 63:
+        name = f"{name[:50]}-{hashlib.sha1(name.encode()).hexdigest()[:12]}"
+    return name
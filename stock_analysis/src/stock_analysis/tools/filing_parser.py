@@ -0,0 +1,170 @@
+import codecs
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Iterable, Iterator, List, Optional
+
+from tools.profiling import PROFILER
+
+ITEM_HEADING = re.compile(r"^item\s+(\d{1,2}[a-c]?)\b\s*[.:\-–—]?\s*(.*)$", re.IGNORECASE)
+PART_HEADING = re.compile(r"^part\s+(iv|iii|ii|i)\b", re.IGNORECASE)
+# Headings are short lines; anything longer is running text that happens to start with "Item".
+MAX_HEADING_LENGTH = 150
+
+BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "table", "section", "article",
+    "h1", "h2", "h3", "h4", "h5", "h6", "title",
+}
+SKIP_TAGS = {"script", "style", "head", "ix:header"}
+
+
+@dataclass
+class FilingChunk:
+    """A piece of filing text together with the SEC item it belongs to.
+
+    ``status`` is only set on chunks produced by a filing diff, where it is
+    ``"new"`` for an item missing from the previous filing and ``"modified"``
+    otherwise.
+    """
+    section: str
+    title: str
+    part: str
+    text: str
+    status: str = ""
+
+
+def normalize_section(section: str) -> str:
+    """Turns user input like ``"item 7"``, ``"7"`` or ``"1a"`` into ``"Item 7"`` / ``"Item 1A"``."""
+    section = section.strip()
+    match = ITEM_HEADING.match(section) or ITEM_HEADING.match(f"Item {section}")
+    if match is None:
+        return section
+    return f"Item {match.group(1).upper()}"
+
+
+class _BlockParser(HTMLParser):
+    """Incremental HTML to text-block converter.
+
+    Text is emitted one block (paragraph, heading, table row) at a time so that
+    the caller never has to hold the whole document. Table rows keep their cell
+    structure as ``cell | cell | cell`` lines.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = deque()
+        self._line: List[str] = []
+        self._cells: List[str] = []
+        self._skip_depth = 0
+        self._table_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "table":
+            self._flush_line()
+            self._table_depth += 1
+        elif tag == "tr":
+            self._cells = []
+        elif tag in BLOCK_TAGS and self._table_depth == 0:
+            self._flush_line()
+
+    def handle_startendtag(self, tag, attrs):
+        if tag == "br" and self._table_depth == 0:
+            self._flush_line()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif self._table_depth > 0:
+            if tag in ("td", "th"):
+                cell = self._take_line()
+                if cell:
+                    self._cells.append(cell)
+            elif tag == "tr":
+                if self._cells:
+                    self.blocks.append((" | ".join(self._cells), True))
+                self._cells = []
+            elif tag == "table":
+                self._table_depth -= 1
+        elif tag in BLOCK_TAGS:
+            self._flush_line()
+
+    def handle_data(self, data):
+        if self._skip_depth == 0:
+            self._line.append(data)
+
+    def close(self):
+        super().close()
+        self._flush_line()
+
+    def _take_line(self) -> str:
+        line = " ".join("".join(self._line).split())
+        self._line = []
+        return line
+
+    def _flush_line(self):
+        line = self._take_line()
+        if line:
+            self.blocks.append((line, False))
+
+
+def iter_filing_chunks(raw_chunks: Iterable[bytes], max_chars: int = 16000, encoding: str = "utf-8") -> Iterator[FilingChunk]:
+    """Streams a filing's HTML and yields text chunks tagged with their SEC item.
+
+    ``raw_chunks`` can be any iterable of bytes (e.g. ``response.iter_content()``
+    or a file read in blocks). Punctuation and table rows are preserved, and a
+    chunk never spans two items, so the resulting index can be searched per item.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    parser = _BlockParser()
+    section, title, part = "Cover", "", ""
+    buffer: List[str] = []
+    size = 0
+
+    def flush() -> Optional[FilingChunk]:
+        nonlocal buffer, size
+        if not buffer:
+            return None
+        chunk = FilingChunk(section=section, title=title, part=part, text="\n".join(buffer))
+        buffer, size = [], 0
+        return chunk
+
+    def drain() -> Iterator[FilingChunk]:
+        nonlocal section, title, part, size
+        while parser.blocks:
+            line, in_table = parser.blocks.popleft()
+            if not in_table and len(line) <= MAX_HEADING_LENGTH:
+                part_match = PART_HEADING.match(line)
+                item_match = ITEM_HEADING.match(line)
+                if part_match or item_match:
+                    # The previous item ends here, before the heading switches its part.
+                    chunk = flush()
+                    if chunk:
+                        yield chunk
+                if part_match:
+                    part = part_match.group(1).upper()
+                elif item_match:
+                    section = f"Item {item_match.group(1).upper()}"
+                    title = item_match.group(2)
+            buffer.append(line)
+            size += len(line) + 1
+            if size >= max_chars:
+                yield flush()
+
+    parse_seconds = 0.0
+    for raw in raw_chunks:
+        start = time.perf_counter()
+        parser.feed(decoder.decode(raw))
+        parse_seconds += time.perf_counter() - start
+        yield from drain()
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    yield from drain()
+    chunk = flush()
+    if chunk:
+        yield chunk
+    PROFILER.add("html_extraction", parse_seconds)
+
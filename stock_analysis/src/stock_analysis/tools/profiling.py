@@ -0,0 +1,98 @@
+import itertools
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict
+
+
+class StageProfiler:
+    """Accumulates wall time and call counts per pipeline stage, across threads.
+
+    The SEC tools, the filing index and the LLM client report into the
+    process-wide ``PROFILER``; it costs two ``perf_counter`` calls per stage and
+    is what ``benchmarks/pipeline_benchmark.py`` reads after a run. Stages can
+    nest (``filing_download`` includes ``html_extraction``).
+
+    While tracemalloc is tracing, it also records each stage's peak memory:
+    the most traced memory above what was allocated when the stage started.
+    Stages running at the same time in other threads count towards each
+    other's peaks. ``peak_bytes`` is the peak of the whole run, since the
+    profiler resets tracemalloc's own peak at every stage boundary.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.peaks: Dict[str, int] = {}
+        self.peak_bytes = 0
+        # Stages in progress: token -> [name, memory at start, peak above it so far].
+        self._open: Dict[int, list] = {}
+        self._tokens = itertools.count()
+
+    @contextmanager
+    def stage(self, name: str):
+        token = self._enter(name) if tracemalloc.is_tracing() else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+            if token is not None:
+                self._exit(token)
+
+    def _enter(self, name: str) -> int:
+        token = next(self._tokens)
+        with self._lock:
+            current = self._checkpoint()
+            self._open[token] = [name, current, 0]
+        return token
+
+    def _exit(self, token: int) -> None:
+        with self._lock:
+            self._checkpoint()
+            name, _, peak = self._open.pop(token)
+            self.peaks[name] = max(self.peaks.get(name, 0), peak)
+
+    def _checkpoint(self) -> int:
+        """Charge the peak since the last checkpoint to every open stage and start a new interval."""
+        if not tracemalloc.is_tracing():
+            return 0
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak_bytes = max(self.peak_bytes, peak)
+        for stage in self._open.values():
+            stage[2] = max(stage[2], peak - stage[1])
+        tracemalloc.reset_peak()
+        return current
+
+    def traced_peak(self) -> int:
+        """Peak traced memory since the last reset, across stage boundaries."""
+        with self._lock:
+            self._checkpoint()
+            return self.peak_bytes
+
+    def add(self, name: str, seconds: float, calls: int = 1) -> None:
+        with self._lock:
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+            self.calls[name] = self.calls.get(name, 0) + calls
+
+    def reset(self) -> None:
+        with self._lock:
+            self.seconds.clear()
+            self.calls.clear()
+            self.peaks.clear()
+            self.peak_bytes = 0
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshot = {name: {"seconds": self.seconds[name], "calls": self.calls[name]} for name in self.seconds}
+            for name, peak in self.peaks.items():
+                if name in snapshot:
+                    snapshot[name]["peak_memory_mb"] = peak / 2 ** 20
+            return snapshot
+
+
+PROFILER = StageProfiler()
@@ -0,0 +1,296 @@
+import ast
+import math
+import operator
+from decimal import Decimal, DecimalException
+from functools import lru_cache
+from typing import Any, Callable, Dict, Sequence, Tuple, Union
+
+Number = Union[int, float, Decimal]
+
+MAX_EXPRESSION_LENGTH = 2000
+MAX_EXPONENT = 1000
+# Powers whose result would be larger than this are refused before computing
+# them, so nesting them (``((10**1000)**1000)**3``) can not exhaust CPU or memory.
+MAX_RESULT_DIGITS = 3000
+
+
+class ExpressionError(ValueError):
+    """Raised when an expression is not allowed or cannot be evaluated."""
+
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+def _sqrt(x):
+    return x.sqrt() if isinstance(x, Decimal) else math.sqrt(x)
+
+
+def _round(x, ndigits=None):
+    # In Decimal mode ndigits arrives as a Decimal, which round() refuses.
+    return round(x) if ndigits is None else round(x, int(ndigits))
+
+
+def _log(x, base=None):
+    if isinstance(x, Decimal):
+        return x.ln() if base is None else x.ln() / Decimal(base).ln()
+    return math.log(x) if base is None else math.log(x, base)
+
+
+def _log10(x):
+    return x.log10() if isinstance(x, Decimal) else math.log10(x)
+
+
+def _exp(x):
+    return x.exp() if isinstance(x, Decimal) else math.exp(x)
+
+
+def _mean(values):
+    values = _as_vector(values)
+    return sum(values) / len(values)
+
+
+def _growth(values):
+    """Period-over-period growth rates of a series, e.g. quarterly revenue."""
+    values = _as_vector(values)
+    return tuple((b - a) / abs(a) for a, b in zip(values, values[1:], strict=False))
+
+
+def _cagr(values, periods=None):
+    """Compound growth rate per period between the first and last value of a series."""
+    values = _as_vector(values)
+    periods = periods if periods is not None else len(values) - 1
+    ratio = values[-1] / values[0]
+    if isinstance(ratio, Decimal):
+        return ratio ** (Decimal(1) / Decimal(periods)) - 1
+    return ratio ** (1 / periods) - 1
+
+
+# Element-wise functions are mapped over vectors; reducers take the whole vector.
+_ELEMENTWISE_FUNCTIONS: Dict[str, Callable] = {
+    "abs": abs,
+    "round": _round,
+    "sqrt": _sqrt,
+    "log": _log,
+    "log10": _log10,
+    "exp": _exp,
+}
+
+_REDUCING_FUNCTIONS: Dict[str, Callable] = {
+    "sum": lambda values: sum(_as_vector(values)),
+    "min": lambda *values: min(_as_vector(values[0]) if len(values) == 1 else values),
+    "max": lambda *values: max(_as_vector(values[0]) if len(values) == 1 else values),
+    "mean": _mean,
+    "avg": _mean,
+    "growth": _growth,
+    "cagr": _cagr,
+}
+
+_CONSTANTS = {"pi": math.pi, "e": math.e}
+
+
+def _as_vector(value) -> Tuple:
+    if isinstance(value, tuple):
+        if not value:
+            raise ExpressionError("empty list")
+        return value
+    raise ExpressionError("expected a list of numbers")
+
+
+def _broadcast(function: Callable, left, right):
+    """Applies a binary operator element-wise when either side is a list."""
+    if isinstance(left, tuple) and isinstance(right, tuple):
+        if len(left) != len(right):
+            raise ExpressionError(
+                f"lists have different lengths ({len(left)} and {len(right)})"
+            )
+        return tuple(function(a, b) for a, b in zip(left, right, strict=True))
+    if isinstance(left, tuple):
+        return tuple(function(a, right) for a in left)
+    if isinstance(right, tuple):
+        return tuple(function(left, b) for b in right)
+    return function(left, right)
+
+
+def _digits(value) -> float:
+    """Number of decimal digits of the integer part of a non-zero number."""
+    if isinstance(value, Decimal):
+        return float(value.adjusted() + 1)
+    if isinstance(value, int):
+        return value.bit_length() * math.log10(2)
+    return math.log10(value) + 1
+
+
+def _power(base, exponent):
+    if abs(exponent) > MAX_EXPONENT:
+        raise ExpressionError(f"exponent larger than {MAX_EXPONENT}")
+    digits = _digits(abs(base)) * float(abs(exponent)) if abs(base) > 1 else 0.0
+    if digits > MAX_RESULT_DIGITS:
+        raise ExpressionError(f"result larger than {MAX_RESULT_DIGITS} digits")
+    return operator.pow(base, exponent)
+
+
+class _Compiler:
+    """Turns a whitelisted expression AST into a tree of closures.
+
+    Only numbers, lists, names bound at call time, arithmetic operators and the
+    functions above are accepted, so evaluating untrusted (LLM) input can not
+    reach attributes, builtins or imports the way ``eval`` can.
+    """
+
+    def __init__(self, source: str, use_decimal: bool):
+        self.source = source
+        self.use_decimal = use_decimal
+
+    def compile(self, node: ast.AST) -> Callable[[Dict[str, Any]], Any]:
+        method = getattr(self, f"_compile_{type(node).__name__}", None)
+        if method is None:
+            raise ExpressionError(f"unsupported syntax: {type(node).__name__}")
+        return method(node)
+
+    def _compile_Expression(self, node: ast.Expression):
+        return self.compile(node.body)
+
+    def _compile_Constant(self, node: ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ExpressionError(f"unsupported constant: {node.value!r}")
+        value = node.value
+        if self.use_decimal:
+            # Build the Decimal from the literal text, so 0.1 stays exactly 0.1.
+            literal = ast.get_source_segment(self.source, node) or repr(node.value)
+            value = Decimal(literal)
+        return lambda _env: value
+
+    def _compile_List(self, node: ast.List):
+        items = [self.compile(item) for item in node.elts]
+        return lambda env: tuple(item(env) for item in items)
+
+    _compile_Tuple = _compile_List
+
+    def _compile_Name(self, node: ast.Name):
+        name = node.id
+        if name in _CONSTANTS:
+            value = _CONSTANTS[name]
+            if self.use_decimal:
+                value = Decimal(str(value))
+            return lambda _env: value
+
+        def lookup(env):
+            try:
+                return env[name]
+            except KeyError:
+                raise ExpressionError(f"unknown name: {name}") from None
+        return lookup
+
+    def _compile_BinOp(self, node: ast.BinOp):
+        function = _BINARY_OPERATORS.get(type(node.op))
+        if function is None:
+            raise ExpressionError(f"unsupported operator: {type(node.op).__name__}")
+        if function is operator.pow:
+            function = _power
+        left, right = self.compile(node.left), self.compile(node.right)
+        return lambda env: _broadcast(function, left(env), right(env))
+
+    def _compile_UnaryOp(self, node: ast.UnaryOp):
+        function = _UNARY_OPERATORS.get(type(node.op))
+        if function is None:
+            raise ExpressionError(f"unsupported operator: {type(node.op).__name__}")
+        operand = self.compile(node.operand)
+
+        def apply(env):
+            value = operand(env)
+            if isinstance(value, tuple):
+                return tuple(function(v) for v in value)
+            return function(value)
+        return apply
+
+    def _compile_Call(self, node: ast.Call):
+        if not isinstance(node.func, ast.Name) or node.keywords:
+            raise ExpressionError("only plain function calls are supported")
+        name = node.func.id
+        args = [self.compile(arg) for arg in node.args]
+        if name in _ELEMENTWISE_FUNCTIONS:
+            function = _ELEMENTWISE_FUNCTIONS[name]
+
+            def call_elementwise(env):
+                values = [arg(env) for arg in args]
+                if values and isinstance(values[0], tuple):
+                    return tuple(function(v, *values[1:]) for v in values[0])
+                return function(*values)
+            return call_elementwise
+        if name in _REDUCING_FUNCTIONS:
+            function = _REDUCING_FUNCTIONS[name]
+            return lambda env: function(*[arg(env) for arg in args])
+        raise ExpressionError(f"unknown function: {name}")
+
+
+class CompiledExpression:
+    """An expression parsed and validated once, cheap to evaluate many times."""
+
+    def __init__(self, source: str, use_decimal: bool = False):
+        if len(source) > MAX_EXPRESSION_LENGTH:
+            raise ExpressionError(
+                f"expression longer than {MAX_EXPRESSION_LENGTH} characters"
+            )
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+            self._function = _Compiler(source.strip(), use_decimal).compile(tree)
+        except SyntaxError as e:
+            raise ExpressionError(
+                f"invalid syntax in mathematical expression: {e.msg}"
+            ) from None
+        except (RecursionError, MemoryError):
+            raise ExpressionError("expression is nested too deeply") from None
+        self.source = source
+        self.use_decimal = use_decimal
+
+    def __call__(self, **variables: Union[Number, Sequence[Number]]) -> Any:
+        env = {name: self._coerce(value) for name, value in variables.items()}
+        try:
+            return self._function(env)
+        except ZeroDivisionError:
+            raise ExpressionError("division by zero") from None
+        except (RecursionError, MemoryError):
+            raise ExpressionError("expression is nested too deeply") from None
+        except (DecimalException, OverflowError, TypeError, ValueError) as e:
+            if isinstance(e, ExpressionError):
+                raise
+            raise ExpressionError(f"could not evaluate expression: {e}") from None
+
+    def _coerce(self, value):
+        if isinstance(value, (list, tuple)):
+            return tuple(self._coerce(v) for v in value)
+        return Decimal(str(value)) if self.use_decimal else value
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(source: str, use_decimal: bool = False) -> CompiledExpression:
+    """Parses, validates and compiles an expression; repeated sources hit the cache."""
+    return CompiledExpression(source, use_decimal)
+
+
+@lru_cache(maxsize=4096)
+def _evaluate_cached(source: str, use_decimal: bool) -> Any:
+    return compile_expression(source, use_decimal)()
+
+
+def evaluate(source: str, use_decimal: bool = False) -> Any:
+    """Safely evaluates an expression such as ``200*7`` or ``growth([10, 12, 15])``.
+
+    Results of constant expressions are memoized, so an agent repeating the same
+    calculation costs a dictionary lookup. List results are returned as lists.
+    """
+    result = _evaluate_cached(source, use_decimal)
+    return list(result) if isinstance(result, tuple) else result
@@ -1,12 +1,163 @@
 import os
+import threading
+import time
 from typing import Any, Optional, Type
+from pydantic import PrivateAttr
 from pydantic.v1 import BaseModel, Field
-from crewai_tools import RagTool
-from sec_api import QueryApi  # Make sure to have sec_api installed
+from crewai_tools import BaseTool, RagTool
+from sec_api import QueryApi, XbrlApi  # Make sure to have sec_api installed
 from embedchain.models.data_type import DataType
 import requests
-import html2text
-import re
+
+from tools.filing_cache import CachedFiling, FilingCache
+from tools.filing_diff import diff_filings
+from tools.filing_index import get_filing_adapter, query_filing
+from tools.filing_parser import normalize_section
+from tools.profiling import PROFILER
+from tools.tool_registry import LazyAdapter, resolve_adapter
+from tools.xbrl_facts import METRICS, RATIOS, FinancialFacts
+
+SEC_HEADERS = {
+    "User-Agent": "crewai.com bisan@crewai.com",
+    "Accept-Encoding": "gzip, deflate",
+    "Host": "www.sec.gov"
+}
+
+
+class RateLimiter:
+    """Spaces out calls so that at most ``rate`` of them start per second, across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+# SEC's fair access policy allows 10 requests per second per user agent; stay below it.
+SEC_RATE_LIMITER = RateLimiter(float(os.environ.get("SEC_MAX_REQUESTS_PER_SECOND", 8)))
+
+
+def query_filings(stock_name: str, form_type: str, offset: int = 0) -> Optional[dict]:
+    """Asks SEC-API for a filing's metadata; ``offset`` 0 is the latest, 1 the one before it, etc."""
+    queryApi = QueryApi(api_key=os.environ['SEC_API_API_KEY'])
+    query = {
+        "query": {
+            "query_string": {
+                "query": f"ticker:{stock_name} AND formType:\"{form_type}\""
+            }
+        },
+        "from": str(offset),
+        "size": "1",
+        "sort": [{ "filedAt": { "order": "desc" }}]
+    }
+    SEC_RATE_LIMITER.wait()
+    with PROFILER.stage("sec_query"):
+        filings = queryApi.get_filings(query)['filings']
+    if len(filings) == 0:
+        return None
+    return filings[0]
+
+def download_filing(stock_name: str, form_type: str, filing: dict, cache: FilingCache, latest: bool = True) -> CachedFiling:
+    """Streams the filing straight into the cache, splitting it into SEC items on the way."""
+    SEC_RATE_LIMITER.wait()
+    with PROFILER.stage("filing_download"), requests.get(filing['linkToFilingDetails'], headers=SEC_HEADERS, stream=True) as response:
+        response.raise_for_status()
+        return cache.put(stock_name, form_type, filing, response.iter_content(chunk_size=64 * 1024), latest=latest)
+
+def fetch_latest_filing(stock_name: str, form_type: str, cache: Optional[FilingCache] = None) -> Optional[CachedFiling]:
+    """Returns the latest filing of ``form_type`` for ``stock_name``, going through the on-disk cache.
+
+    A cached filing younger than the cache TTL is returned without touching the
+    network. Otherwise SEC-API is asked for the latest accession number and the
+    filing is only downloaded again if a newer one has been published.
+    """
+    cache = cache or FilingCache()
+    cached = cache.latest(stock_name, form_type)
+    if cached is not None and cache.is_fresh(stock_name, form_type):
+        return cached
+
+    try:
+        filing = query_filings(stock_name, form_type)
+        if filing is None:
+            print("No filings found for this stock.")
+            return cached
+
+        hit = cache.get(stock_name, form_type, filing['accessionNo'])
+        if hit is not None:
+            cache.mark_checked(stock_name, form_type, hit.accession_no)
+            return hit
+        return download_filing(stock_name, form_type, filing, cache)
+    except requests.exceptions.HTTPError as e:
+        print(f"HTTP error occurred: {e}")
+        return cached
+    except Exception as e:
+        print(f"Error fetching {form_type} URL: {e}")
+        return cached
+
+def fetch_previous_filing(current: CachedFiling, cache: Optional[FilingCache] = None) -> Optional[CachedFiling]:
+    """Returns the filing of the same form published before ``current``.
+
+    The last one we analysed (i.e. the newest older filing in the cache) is
+    preferred; only if there is none is the previous filing looked up on
+    SEC-API and downloaded.
+    """
+    cache = cache or FilingCache()
+    previous = cache.previous(current)
+    if previous is not None:
+        return previous
+    try:
+        filing = query_filings(current.ticker, current.form_type, offset=1)
+        if filing is None or filing['accessionNo'] == current.accession_no:
+            return None
+        hit = cache.get(current.ticker, current.form_type, filing['accessionNo'])
+        if hit is not None:
+            return hit
+        return download_filing(current.ticker, current.form_type, filing, cache, latest=False)
+    except Exception as e:
+        print(f"Error fetching previous {current.form_type}: {e}")
+        return None
+
+def fetch_xbrl(filing: CachedFiling, cache: Optional[FilingCache] = None) -> Optional[dict]:
+    """Returns the XBRL financial data of ``filing`` as JSON, downloading it once per filing."""
+    cache = cache or FilingCache()
+    data = cache.get_xbrl(filing)
+    if data is not None:
+        return data
+    try:
+        SEC_RATE_LIMITER.wait()
+        with PROFILER.stage("xbrl_fetch"):
+            data = XbrlApi(api_key=os.environ['SEC_API_API_KEY']).xbrl_to_json(accession_no=filing.accession_no)
+    except Exception as e:
+        print(f"Error fetching XBRL data for {filing.form_type} {filing.accession_no}: {e}")
+        return None
+    cache.put_xbrl(filing, data)
+    return data
+
+def latest_filing_adapter(stock_name: str, form_type: str, summarize: bool = False):
+    """Fetches the latest filing and attaches to its shared index; used as a LazyAdapter factory."""
+    filing = fetch_latest_filing(stock_name, form_type)
+    if filing is None:
+        raise ValueError(f"No {form_type} filing found for {stock_name}.")
+    return get_filing_adapter(filing, summarize=summarize)
+
+def filing_changes_adapter(stock_name: str, form_type: str, summarize: bool = False):
+    """Indexes only what changed since the previous filing; used as a LazyAdapter factory."""
+    cache = FilingCache()
+    current = fetch_latest_filing(stock_name, form_type, cache)
+    if current is None:
+        raise ValueError(f"No {form_type} filing found for {stock_name}.")
+    previous = fetch_previous_filing(current, cache)
+    if previous is None:
+        raise ValueError(f"No earlier {form_type} filing found for {stock_name} to compare with.")
+    return get_filing_adapter(diff_filings(previous, current, cache), summarize=summarize)
 
 class FixedSEC10KToolSchema(BaseModel):
     """Input for SEC10KTool."""
@@ -14,6 +165,10 @@ class FixedSEC10KToolSchema(BaseModel):
         ...,
         description="Mandatory query you would like to search from the 10-K report",
     )
+    section: Optional[str] = Field(
+        None,
+        description="Optional SEC item to restrict the search to, e.g. 'Item 7' for MD&A or 'Item 1A' for Risk Factors",
+    )
 
 class SEC10KToolSchema(FixedSEC10KToolSchema):
     """Input for SEC10KTool."""
@@ -27,65 +182,35 @@ class SEC10KTool(RagTool):
     args_schema: Type[BaseModel] = SEC10KToolSchema
 
     def __init__(self, stock_name: Optional[str] = None, **kwargs):
-        print("enter init")
-        # exit()
+        if stock_name is not None and "adapter" not in kwargs and "config" not in kwargs:
+            # Download the filing and attach to its shared index only when the tool is first used.
+            summarize = kwargs.get("summarize", False)
+            kwargs["adapter"] = LazyAdapter(factory=lambda: latest_filing_adapter(stock_name, "10-K", summarize))
         super().__init__(**kwargs)
         if stock_name is not None:
-            content = self.get_10k_url_content(stock_name)
-            if content:
-                self.add(content)
-                # print("exit init")
-                # exit()
-                self.description = f"A tool that can be used to semantic search a query from {stock_name}'s latest 10-K SEC form's content as a txt file."
-                self.args_schema = FixedSEC10KToolSchema
-                self._generate_description()
+            self.description = f"A tool that can be used to semantic search a query from {stock_name}'s latest 10-K SEC form's content as a txt file."
+            self.args_schema = FixedSEC10KToolSchema
+            self._generate_description()
 
     def get_10k_url_content(self, stock_name: str) -> Optional[str]:
         """Fetches the URL content as txt of the latest 10-K form for the given stock name."""
-        try:
-            queryApi = QueryApi(api_key=os.environ['SEC_API_API_KEY'])
-            query = {
-                "query": {
-                    "query_string": {
-                        "query": f"ticker:{stock_name} AND formType:\"10-K\""
-                    }
-                },
-                "from": "0",
-                "size": "1",
-                "sort": [{ "filedAt": { "order": "desc" }}]
-            }
-            filings = queryApi.get_filings(query)['filings']
-            if len(filings) == 0:
-                print("No filings found for this stock.")
-                return None
-
-            url = filings[0]['linkToFilingDetails']
-            
-            headers = {
-                "User-Agent": "crewai.com bisan@crewai.com",
-                "Accept-Encoding": "gzip, deflate",
-                "Host": "www.sec.gov"
-            }
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()  
-            h = html2text.HTML2Text()
-            h.ignore_links = False
-            text = h.handle(response.content.decode("utf-8"))
-
-            text = re.sub(r"[^a-zA-Z$0-9\s\n]", "", text)
-            return text
-        except requests.exceptions.HTTPError as e:
-            print(f"HTTP error occurred: {e}")
-            return None
-        except Exception as e:
-            print(f"Error fetching 10-K URL: {e}")
+        filing = fetch_latest_filing(stock_name, "10-K")
+        if filing is None:
             return None
+        return filing.text()
 
     def add(self, *args: Any, **kwargs: Any) -> None:
         kwargs["data_type"] = DataType.TEXT
         super().add(*args, **kwargs)
 
-    def _run(self, search_query: str, **kwargs: Any) -> Any:
+    def _run(self, search_query: str, section: Optional[str] = None, **kwargs: Any) -> Any:
+        with PROFILER.stage("retrieval"):
+            return self._search(search_query, section, **kwargs)
+
+    def _search(self, search_query: str, section: Optional[str] = None, **kwargs: Any) -> Any:
+        if section:
+            self._before_run(search_query, **kwargs)
+            return f"Relevant Content:\n{query_filing(resolve_adapter(self.adapter), search_query, normalize_section(section))}"
         return super()._run(query=search_query, **kwargs)
 
 
@@ -95,6 +220,14 @@ class FixedSEC10QToolSchema(BaseModel):
         ...,
         description="Mandatory query you would like to search from the 10-Q report",
     )
+    section: Optional[str] = Field(
+        None,
+        description="Optional SEC item to restrict the search to, e.g. 'Item 7' for MD&A or 'Item 1A' for Risk Factors",
+    )
+    changes_only: bool = Field(
+        False,
+        description="Set to true to only search paragraphs that are new or modified since the previous 10-Q",
+    )
 
 class SEC10QToolSchema(FixedSEC10QToolSchema):
     """Input for SEC10QTool."""
@@ -106,65 +239,106 @@ class SEC10QTool(RagTool):
     name: str = "Search in the specified 10-Q form"
     description: str = "A tool that can be used to semantic search a query from a 10-Q form for a specified company."
     args_schema: Type[BaseModel] = SEC10QToolSchema
+    changes_adapter: Optional[LazyAdapter] = None
 
     def __init__(self, stock_name: Optional[str] = None, **kwargs):
-        print("enter init")
-        # exit()
+        if stock_name is not None and "adapter" not in kwargs and "config" not in kwargs:
+            # Download the filing and attach to its shared index only when the tool is first used.
+            summarize = kwargs.get("summarize", False)
+            kwargs["adapter"] = LazyAdapter(factory=lambda: latest_filing_adapter(stock_name, "10-Q", summarize))
+            # The index of what changed since the previous 10-Q is only built if changes are asked for.
+            kwargs["changes_adapter"] = LazyAdapter(factory=lambda: filing_changes_adapter(stock_name, "10-Q", summarize))
         super().__init__(**kwargs)
         if stock_name is not None:
-            content = self.get_10q_url_content(stock_name)
-            if content:
-                self.add(content)
-                self.description = f"A tool that can be used to semantic search a query from {stock_name}'s latest 10-Q SEC form's content as a txt file."
-                self.args_schema = FixedSEC10QToolSchema
-                self._generate_description()
+            self.description = f"A tool that can be used to semantic search a query from {stock_name}'s latest 10-Q SEC form's content as a txt file, or only what changed since the previous 10-Q."
+            self.args_schema = FixedSEC10QToolSchema
+            self._generate_description()
 
     def get_10q_url_content(self, stock_name: str) -> Optional[str]:
         """Fetches the URL content as txt of the latest 10-Q form for the given stock name."""
-        try:
-            queryApi = QueryApi(api_key=os.environ['SEC_API_API_KEY'])
-            query = {
-                "query": {
-                    "query_string": {
-                        "query": f"ticker:{stock_name} AND formType:\"10-Q\""
-                    }
-                },
-                "from": "0",
-                "size": "1",
-                "sort": [{ "filedAt": { "order": "desc" }}]
-            }
-            filings = queryApi.get_filings(query)['filings']
-            if len(filings) == 0:
-                print("No filings found for this stock.")
-                return None
-
-            url = filings[0]['linkToFilingDetails']
-            
-            headers = {
-                "User-Agent": "crewai.com bisan@crewai.com",
-                "Accept-Encoding": "gzip, deflate",
-                "Host": "www.sec.gov"
-            }
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            h = html2text.HTML2Text()
-            h.ignore_links = False
-            text = h.handle(response.content.decode("utf-8"))
-
-            # Removing all non-English words, dollar signs, numbers, and newlines from text
-            text = re.sub(r"[^a-zA-Z$0-9\s\n]", "", text)
-            return text
-        except requests.exceptions.HTTPError as e:
-            print(f"HTTP error occurred: {e}")
-            return None
-        except Exception as e:
-            print(f"Error fetching 10-Q URL: {e}")
+        filing = fetch_latest_filing(stock_name, "10-Q")
+        if filing is None:
             return None
+        return filing.text()
 
     def add(self, *args: Any, **kwargs: Any) -> None:
         kwargs["data_type"] = DataType.TEXT
         super().add(*args, **kwargs)
 
-    def _run(self, search_query: str, **kwargs: Any) -> Any:
+    def _run(self, search_query: str, section: Optional[str] = None, changes_only: bool = False, **kwargs: Any) -> Any:
+        with PROFILER.stage("retrieval"):
+            return self._search(search_query, section, changes_only, **kwargs)
+
+    def _search(self, search_query: str, section: Optional[str] = None, changes_only: bool = False, **kwargs: Any) -> Any:
+        if changes_only and self.changes_adapter is not None:
+            self._before_run(search_query, **kwargs)
+            section = normalize_section(section) if section else None
+            return f"Relevant Changes:\n{query_filing(self.changes_adapter.resolve(), search_query, section)}"
+        if section:
+            self._before_run(search_query, **kwargs)
+            return f"Relevant Content:\n{query_filing(resolve_adapter(self.adapter), search_query, normalize_section(section))}"
         return super()._run(query=search_query, **kwargs)
 
+
+FINANCIAL_FACTS_USAGE = (
+    f"Supported metrics: {', '.join(METRICS)}. Supported ratios: {', '.join(RATIOS)}. "
+    "Add ' growth' to any metric for year-over-year growth, or pass a us-gaap concept name."
+)
+
+class FixedSECFinancialFactsToolSchema(BaseModel):
+    """Input for SECFinancialFactsTool."""
+    metrics: str = Field(
+        ...,
+        description=(
+            "Mandatory comma separated list of metrics, ratios or growth rates, e.g. "
+            "'revenue, net income, eps, gross margin, revenue growth'"
+        ),
+    )
+
+class SECFinancialFactsToolSchema(FixedSECFinancialFactsToolSchema):
+    """Input for SECFinancialFactsTool."""
+    stock_name: str = Field(
+        ..., description="Mandatory valid stock name you would like to get the financial facts of"
+    )
+
+class SECFinancialFactsTool(BaseTool):
+    name: str = "Get exact financial facts from the latest 10-K and 10-Q"
+    description: str = (
+        "A tool that returns exact reported numbers from a company's latest 10-K and 10-Q XBRL data. "
+        + FINANCIAL_FACTS_USAGE
+    )
+    args_schema: Type[BaseModel] = SECFinancialFactsToolSchema
+    _stock_name: Optional[str] = PrivateAttr(default=None)
+    _facts: Optional[FinancialFacts] = PrivateAttr(default=None)
+
+    def __init__(self, stock_name: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        if stock_name is not None:
+            # The XBRL data is only fetched on the first call.
+            self._stock_name = stock_name
+            self.description = f"A tool that returns exact reported numbers from {stock_name}'s latest 10-K and 10-Q XBRL data. " + FINANCIAL_FACTS_USAGE
+            self.args_schema = FixedSECFinancialFactsToolSchema
+            self._generate_description()
+
+    def load_facts(self, stock_name: str) -> Optional[FinancialFacts]:
+        """Loads the XBRL facts of the latest 10-K and 10-Q into a single columnar store."""
+        documents = []
+        for form_type in ("10-Q", "10-K"):
+            filing = fetch_latest_filing(stock_name, form_type)
+            data = fetch_xbrl(filing) if filing is not None else None
+            if data is not None:
+                documents.append(data)
+        if not documents:
+            return None
+        return FinancialFacts.from_xbrl(documents)
+
+    def _run(self, metrics: str, stock_name: Optional[str] = None, **kwargs: Any) -> Any:
+        if stock_name is not None:
+            facts = self.load_facts(stock_name)
+        else:
+            if self._facts is None and self._stock_name is not None:
+                self._facts = self.load_facts(self._stock_name)
+            facts = self._facts
+        if facts is None:
+            return "No XBRL financial data found for this stock."
+        return facts.describe(metrics.split(","))
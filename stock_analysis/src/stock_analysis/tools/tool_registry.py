@@ -0,0 +1,93 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from crewai_tools import BaseTool
+from crewai_tools.adapters.embedchain_adapter import EmbedchainAdapter
+from crewai_tools.tools.rag.rag_tool import Adapter
+from pydantic import PrivateAttr
+
+T = TypeVar("T", bound=BaseTool)
+
+
+class LazyAdapter(Adapter):
+    """RagTool adapter that only builds the real adapter on its first query.
+
+    Passing it as ``adapter=`` to a RagTool skips the embedding app that RagTool
+    would otherwise create at construction time, so building the tool is free
+    and the expensive part (filing download, embedding model, vector store) is
+    paid by the first agent that actually calls it.
+    """
+
+    factory: Callable[[], Adapter]
+    _adapter: Optional[Adapter] = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _resolve_seconds: Optional[float] = PrivateAttr(default=None)
+
+    @property
+    def resolve_seconds(self) -> Optional[float]:
+        """How long the deferred initialisation took, or None if it has not run yet."""
+        return self._resolve_seconds
+
+    def resolve(self) -> Adapter:
+        with self._lock:
+            if self._adapter is None:
+                start = time.perf_counter()
+                self._adapter = self.factory()
+                self._resolve_seconds = time.perf_counter() - start
+            return self._adapter
+
+    def query(self, question: str) -> str:
+        return self.resolve().query(question)
+
+    def add(self, *args: Any, **kwargs: Any) -> None:
+        self.resolve().add(*args, **kwargs)
+
+
+def default_rag_adapter(summarize: bool = False) -> Adapter:
+    """The adapter RagTool builds by default, for use as a LazyAdapter factory."""
+    from embedchain import App
+
+    return EmbedchainAdapter(embedchain_app=App(), summarize=summarize)
+
+
+def resolve_adapter(adapter: Adapter) -> Adapter:
+    """Returns the real adapter behind a LazyAdapter, or the adapter itself."""
+    return adapter.resolve() if isinstance(adapter, LazyAdapter) else adapter
+
+
+class ToolRegistry:
+    """Builds every tool of a crew at most once and records what it cost.
+
+    Agents ask the registry for tools by name instead of instantiating them, so
+    a tool shared by several agents is constructed once per crew run.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, BaseTool] = {}
+        self._lock = threading.Lock()
+        self.construction_seconds: Dict[str, float] = {}
+
+    def get(self, name: str, factory: Callable[[], T]) -> T:
+        with self._lock:
+            tool = self._tools.get(name)
+            if tool is None:
+                start = time.perf_counter()
+                tool = factory()
+                self.construction_seconds[name] = time.perf_counter() - start
+                self._tools[name] = tool
+            return tool
+
+    def report(self) -> str:
+        """One line per tool with its construction time and, if deferred, its first-use init time."""
+        lines = ["Tool construction times:"]
+        for name, seconds in self.construction_seconds.items():
+            line = f"  {name}: {seconds * 1000:.1f} ms"
+            adapter = getattr(self._tools[name], "adapter", None)
+            if isinstance(adapter, LazyAdapter):
+                if adapter.resolve_seconds is None:
+                    line += ", deferred init never ran"
+                else:
+                    line += f", deferred init {adapter.resolve_seconds * 1000:.1f} ms"
+            lines.append(line)
+        return "\n".join(lines)
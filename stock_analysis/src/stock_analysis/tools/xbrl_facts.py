@@ -0,0 +1,198 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Friendly metric names mapped to the us-gaap concepts that report them, in order of preference.
+METRICS: Dict[str, Tuple[str, ...]] = {
+    "revenue": ("Revenues", "RevenueFromContractWithCustomerExcludingAssessedTax", "SalesRevenueNet"),
+    "cost of revenue": ("CostOfRevenue", "CostOfGoodsAndServicesSold"),
+    "gross profit": ("GrossProfit",),
+    "operating income": ("OperatingIncomeLoss",),
+    "net income": ("NetIncomeLoss",),
+    "eps": ("EarningsPerShareDiluted", "EarningsPerShareBasic"),
+    "total assets": ("Assets",),
+    "total liabilities": ("Liabilities",),
+    "equity": ("StockholdersEquity", "StockholdersEquityIncludingPortionAttributableToNoncontrollingInterest"),
+    "long-term debt": ("LongTermDebtNoncurrent", "LongTermDebt"),
+    "cash": ("CashAndCashEquivalentsAtCarryingValue",),
+    "operating cash flow": ("NetCashProvidedByUsedInOperatingActivities",),
+}
+
+# Ratio name -> (numerator metric, denominator metric).
+RATIOS: Dict[str, Tuple[str, str]] = {
+    "gross margin": ("gross profit", "revenue"),
+    "operating margin": ("operating income", "revenue"),
+    "net margin": ("net income", "revenue"),
+    "debt to equity": ("long-term debt", "equity"),
+    "liabilities to equity": ("total liabilities", "equity"),
+}
+
+GROWTH_SUFFIX = " growth"
+
+
+@dataclass
+class FactSeries:
+    """Values of one concept over time. Instants have ``start == end``."""
+    starts: np.ndarray
+    ends: np.ndarray
+    values: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def keys(self) -> np.ndarray:
+        # Days since epoch fit comfortably in 5 digits, so this is a unique period id.
+        return self.starts.astype(np.int64) * 100_000 + self.ends.astype(np.int64)
+
+
+class FinancialFacts:
+    """Columnar, in-memory store of numeric XBRL facts indexed by concept and period.
+
+    Every fact is one row across four NumPy columns (concept id, period start,
+    period end, value), so series lookups are a boolean mask and ratios or
+    growth rates are computed for all periods at once.
+    """
+
+    def __init__(self, concepts: List[str], concept_ids: np.ndarray, starts: np.ndarray, ends: np.ndarray, values: np.ndarray):
+        self.concepts = concepts
+        self._concept_index = {name: i for i, name in enumerate(concepts)}
+        self.concept_ids = concept_ids
+        self.starts = starts
+        self.ends = ends
+        self.values = values
+
+    @classmethod
+    def from_xbrl(cls, documents: Iterable[dict]) -> "FinancialFacts":
+        """Builds the store from one or more sec-api XBRL-to-JSON documents.
+
+        Dimensional facts (those with a ``segment``) and non-numeric values are
+        skipped; a (concept, period) reported by several documents is kept once.
+        """
+        concepts: Dict[str, int] = {}
+        rows: Dict[Tuple[int, str, str], float] = {}
+        for document in documents:
+            for statement in document.values():
+                if not isinstance(statement, dict):
+                    continue
+                for concept, facts in statement.items():
+                    if not isinstance(facts, list):
+                        continue
+                    for fact in facts:
+                        if not isinstance(fact, dict) or "segment" in fact:
+                            continue
+                        try:
+                            value = float(fact["value"])
+                        except (KeyError, TypeError, ValueError):
+                            continue
+                        period = fact.get("period", {})
+                        end = period.get("endDate") or period.get("instant")
+                        if end is None:
+                            continue
+                        start = period.get("startDate") or end
+                        concept_id = concepts.setdefault(concept, len(concepts))
+                        rows.setdefault((concept_id, start, end), value)
+
+        keys = list(rows)
+        return cls(
+            concepts=list(concepts),
+            concept_ids=np.array([k[0] for k in keys], dtype=np.int32),
+            starts=np.array([k[1] for k in keys], dtype="datetime64[D]"),
+            ends=np.array([k[2] for k in keys], dtype="datetime64[D]"),
+            values=np.array(list(rows.values()), dtype=np.float64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def concept(self, name: str) -> Optional[FactSeries]:
+        """Returns every period reported for an XBRL concept, newest first."""
+        concept_id = self._concept_index.get(name)
+        if concept_id is None:
+            return None
+        mask = self.concept_ids == concept_id
+        order = np.lexsort((self.starts[mask], self.ends[mask]))[::-1]
+        return FactSeries(self.starts[mask][order], self.ends[mask][order], self.values[mask][order])
+
+    def metric(self, name: str) -> Optional[FactSeries]:
+        """Returns a friendly metric (see ``METRICS``) or, failing that, a raw concept."""
+        for concept in METRICS.get(name, (name,)):
+            series = self.concept(concept)
+            if series is not None and len(series):
+                return series
+        if name == "gross profit":
+            # Many filers (e.g. retailers) only report revenue and cost of revenue.
+            return self.subtract(self.metric("revenue"), self.metric("cost of revenue"))
+        return None
+
+    def ratio(self, name: str) -> Optional[FactSeries]:
+        numerator, denominator = RATIOS[name]
+        return self.divide(self.metric(numerator), self.metric(denominator))
+
+    def growth(self, name: str) -> Optional[FactSeries]:
+        """Year-over-year growth of a metric, comparing periods of the same length one year apart."""
+        series = self.metric(name)
+        if series is None or len(series) < 2:
+            return None
+        ends = series.ends.astype(np.int64)
+        lengths = ends - series.starts.astype(np.int64)
+        same_length = np.abs(lengths[:, None] - lengths[None, :]) <= 7
+        year_apart = np.abs((ends[:, None] - ends[None, :]) - 365) <= 7
+        match = same_length & year_apart
+        has_prior = match.any(axis=1)
+        prior = match.argmax(axis=1)[has_prior]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = (series.values[has_prior] - series.values[prior]) / np.abs(series.values[prior])
+            values = np.where(series.values[prior] == 0, np.nan, values)
+        return FactSeries(series.starts[has_prior], series.ends[has_prior], values)
+
+    @staticmethod
+    def divide(numerator: Optional[FactSeries], denominator: Optional[FactSeries]) -> Optional[FactSeries]:
+        """Divides two series over the periods they both report."""
+        if numerator is None or denominator is None:
+            return None
+        i, j = _align(numerator, denominator)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(denominator.values[j] == 0, np.nan, numerator.values[i] / denominator.values[j])
+        return FactSeries(numerator.starts[i], numerator.ends[i], values)
+
+    @staticmethod
+    def subtract(left: Optional[FactSeries], right: Optional[FactSeries]) -> Optional[FactSeries]:
+        """Subtracts two series over the periods they both report."""
+        if left is None or right is None:
+            return None
+        i, j = _align(left, right)
+        return FactSeries(left.starts[i], left.ends[i], left.values[i] - right.values[j])
+
+    def describe(self, names: Iterable[str], limit: int = 8) -> str:
+        """Renders metrics, ratios and ``<metric> growth`` entries as plain text for an agent."""
+        lines = []
+        for name in names:
+            name = name.strip()
+            if name.lower() in _KNOWN_NAMES:
+                name = name.lower()
+            if name in RATIOS:
+                series, percent = self.ratio(name), name in ("gross margin", "operating margin", "net margin")
+            elif name.endswith(GROWTH_SUFFIX):
+                series, percent = self.growth(name[: -len(GROWTH_SUFFIX)]), True
+            else:
+                series, percent = self.metric(name), False
+            if series is None or not len(series):
+                lines.append(f"{name}: not reported")
+                continue
+            lines.append(f"{name}:")
+            for start, end, value in list(zip(series.starts, series.ends, series.values))[:limit]:
+                period = f"{end}" if start == end else f"{start} to {end}"
+                shown = f"{value:.2%}" if percent else f"{value:,.2f}"
+                lines.append(f"  {period}: {shown}")
+        return "\n".join(lines)
+
+
+def _align(left: FactSeries, right: FactSeries) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices of the periods reported by both series, newest first."""
+    _, i, j = np.intersect1d(left.keys(), right.keys(), assume_unique=True, return_indices=True)
+    order = np.argsort(left.ends[i])[::-1]
+    return i[order], j[order]
+
+
+_KNOWN_NAMES = set(METRICS) | set(RATIOS) | {f"{m}{GROWTH_SUFFIX}" for m in METRICS}
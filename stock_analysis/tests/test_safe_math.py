@@ -0,0 +1,25 @@
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "stock_analysis"))
+
+from tools.safe_math import ExpressionError, evaluate  # noqa: E402
+
+
+@pytest.mark.parametrize("use_decimal", [False, True])
+def test_nested_powers_are_refused(use_decimal):
+    with pytest.raises(ExpressionError):
+        evaluate("((10**1000)**1000)**3", use_decimal)
+
+
+@pytest.mark.parametrize("source", ["-" * 1999 + "1", "(" * 1000 + "1" + ")" * 999])
+def test_deep_nesting_is_an_expression_error(source):
+    with pytest.raises(ExpressionError):
+        evaluate(source)
+
+
+def test_round_in_decimal_mode():
+    assert evaluate("round(3.14159, 2)", use_decimal=True) == Decimal("3.14")
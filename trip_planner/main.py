@@ -1,9 +1,12 @@
-from crewai import Crew
 from textwrap import dedent
+
+from crewai import Crew
+from dotenv import load_dotenv
+
+from tools.summary_store import SUMMARY_STORE
 from trip_agents import TripAgents
 from trip_tasks import TripTasks
 
-from dotenv import load_dotenv
 load_dotenv()
 
 class TripCrew:
@@ -79,3 +82,4 @@ if __name__ == "__main__":
   print("## Here is you Trip Plan")
   print("########################\n")
   print(result)
+  print(SUMMARY_STORE.report())
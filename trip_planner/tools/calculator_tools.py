@@ -1,5 +1,8 @@
 from langchain.tools import tool
 
+from tools.safe_math import ExpressionError, evaluate
+
+
 class CalculatorTools():
 
     @tool("Make a calculation")
@@ -10,6 +13,6 @@ class CalculatorTools():
         expression, a couple examples are `200*7` or `5000/2*10`
         """
         try:
-            return eval(operation)
-        except SyntaxError:
-            return "Error: Invalid syntax in mathematical expression"
+            return evaluate(operation)
+        except ExpressionError as e:
+            return f"Error: {e}"
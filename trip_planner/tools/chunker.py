@@ -0,0 +1,132 @@
+"""
+Packs the elements of a scraped page into chunks that fit a token budget.
+
+The input is the element list returned by ``unstructured``'s ``partition_html``.
+Navigation, footers, cookie banners and repeated elements are dropped first;
+the rest is packed into as few chunks as possible without ever cutting an
+element in two, unless a single element is larger than the budget, in which
+case it is split between sentences (or lines, for tables).
+"""
+import os
+import re
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - only when tiktoken is not installed
+    tiktoken = None
+
+DEFAULT_MAX_TOKENS = int(os.environ.get("SCRAPE_CHUNK_TOKENS", 3000))
+
+BOILERPLATE_CATEGORIES = {"Header", "Footer", "PageBreak", "Image", "PageNumber"}
+BOILERPLATE_TEXT = re.compile(
+    r"\b(cookies?|consent|accept all|reject all|privacy (policy|settings)|"
+    r"terms of (use|service)|"
+    r"all rights reserved|subscribe to our newsletter|skip to (main )?content)\b",
+    re.IGNORECASE,
+)
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Counts tokens with the cl100k_base encoding.
+
+    Without tiktoken, estimates 4 characters per token.
+    """
+    global _encoding
+    if tiktoken is None:
+        return (len(text) + 3) // 4
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding("cl100k_base")
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def is_boilerplate(element) -> bool:
+    """True for page furniture: headers, footers, images, short cookie/legal notices."""
+    if getattr(element, "category", None) in BOILERPLATE_CATEGORIES:
+        return True
+    text = str(element).strip()
+    if not text:
+        return True
+    # Only short texts: an article that mentions cookies is still content.
+    return len(text) < 300 and BOILERPLATE_TEXT.search(text) is not None
+
+
+def content_blocks(elements: Iterable) -> Iterator[str]:
+    """Yields the text of every element that is neither boilerplate nor a repeat."""
+    seen = set()
+    for element in elements:
+        if is_boilerplate(element):
+            continue
+        text = str(element).strip()
+        if text in seen:
+            continue
+        seen.add(text)
+        yield text
+
+
+def _split_block(
+    text: str, max_tokens: int, count: Callable[[str], int]
+) -> Iterator[str]:
+    # Tables are split between rows, prose between sentences, and a single
+    # row or sentence over the budget between words.
+    if "\n" in text:
+        pieces, separator = text.split("\n"), "\n"
+    else:
+        pieces, separator = SENTENCE_END.split(text), " "
+    for chunk in pack(pieces, max_tokens, count, separator=separator, split=False):
+        if count(chunk) <= max_tokens:
+            yield chunk
+            continue
+        for words in pack(chunk.split(), max_tokens, count, separator=" ", split=False):
+            tokens = count(words)
+            if tokens <= max_tokens:
+                yield words
+                continue
+            # One "word" over the budget (e.g. an inline data blob): cut it blindly.
+            step = max(1, len(words) * max_tokens // tokens)
+            yield from (words[i:i + step] for i in range(0, len(words), step))
+
+
+def pack(
+    blocks: Iterable[str],
+    max_tokens: int,
+    count: Callable[[str], int] = count_tokens,
+    separator: str = "\n\n",
+    split: bool = True,
+) -> List[str]:
+    """Greedily packs consecutive blocks into chunks of at most ``max_tokens`` tokens.
+
+    With ``split``, a block over the budget is split first (see ``_split_block``)
+    and its pieces are packed like any other block.
+    """
+    separator_tokens = count(separator) if separator else 0
+
+    def sized(blocks: Iterable[str]) -> Iterator[Tuple[str, int]]:
+        for block in blocks:
+            tokens = count(block)
+            if split and tokens > max_tokens:
+                for piece in _split_block(block, max_tokens, count):
+                    yield piece, count(piece)
+            else:
+                yield block, tokens
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for block, tokens in sized(blocks):
+        if current and size + separator_tokens + tokens > max_tokens:
+            chunks.append(separator.join(current))
+            current, size = [], 0
+        size += tokens + (separator_tokens if current else 0)
+        current.append(block)
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+
+def chunk_elements(elements: Iterable, max_tokens: Optional[int] = None) -> List[str]:
+    """Turns ``partition_html`` elements into chunks of at most ``max_tokens``."""
+    return pack(content_blocks(elements), max_tokens or DEFAULT_MAX_TOKENS)
@@ -0,0 +1,267 @@
+"""
+A page cache for the browserless scrape tools, shared by every crew on the machine.
+
+Rendered pages are stored on disk by normalized URL, together with the
+summaries that were made from them, so a page that another agent (or another
+crew) scraped recently is neither rendered nor summarized again. Within
+``PAGE_CACHE_TTL`` seconds a cached page is used as is; after that it is
+revalidated against the site with its ETag/Last-Modified, and only rendered
+again if it changed. Concurrent requests for the same page share one fetch.
+Pages not used for ``PAGE_CACHE_MAX_AGE`` seconds are evicted, and so are the
+least recently used ones once the cache grows beyond ``PAGE_CACHE_MAX_BYTES``.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+BROWSERLESS_URL = os.environ.get("BROWSERLESS_URL", "https://chrome.browserless.io")
+DEFAULT_CACHE_DIR = os.environ.get(
+    "PAGE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "crewai-pages")
+)
+DEFAULT_TTL = int(os.environ.get("PAGE_CACHE_TTL", 60 * 60))
+DEFAULT_MAX_AGE = int(os.environ.get("PAGE_CACHE_MAX_AGE", 7 * 24 * 60 * 60))
+DEFAULT_MAX_BYTES = int(os.environ.get("PAGE_CACHE_MAX_BYTES", 500 * 1024 * 1024))
+EVICTION_INTERVAL = 10 * 60
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+
+
+@dataclass
+class CachedPage:
+    url: str
+    html: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    summaries: Dict[str, str] = field(default_factory=dict)
+
+
+def clean_url(url: str) -> str:
+    """Strips what agents tend to wrap URLs in, and adds a missing scheme."""
+    url = url.strip().strip("'\"`")
+    return url if "://" in url else f"https://{url}"
+
+
+def normalize_url(url: str) -> str:
+    """Cache key of a URL.
+
+    The host is lowercased; the fragment, a default port, tracking parameters and
+    a trailing slash are dropped.
+    """
+    parts = urlsplit(clean_url(url))
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMS)
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def render_with_browserless(url: str) -> Tuple[str, Dict[str, str]]:
+    """Renders ``url`` in browserless and returns the HTML and the response headers."""
+    endpoint = f"{BROWSERLESS_URL}/content?token={os.environ['BROWSERLESS_API_KEY']}"
+    payload = json.dumps({"url": url})
+    headers = {'cache-control': 'no-cache', 'content-type': 'application/json'}
+    response = requests.request("POST", endpoint, headers=headers, data=payload)
+    response.raise_for_status()
+    return response.text, dict(response.headers)
+
+
+class PageCache():
+    """Disk-backed cache of rendered pages and their summaries.
+
+    It is safe to share between threads and processes.
+    """
+
+    def __init__(
+        self,
+        root: str = DEFAULT_CACHE_DIR,
+        ttl: int = DEFAULT_TTL,
+        render: Callable[[str], Tuple[str, Dict[str, str]]] = render_with_browserless,
+        session: Optional[requests.Session] = None,
+        max_age: int = DEFAULT_MAX_AGE,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.render = render
+        self.session = session or requests.Session()
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.stats = {
+            "hits": 0, "revalidated": 0, "renders": 0, "coalesced": 0,
+            "summary_hits": 0, "summaries": 0, "evicted": 0,
+        }
+        self._in_flight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._evicted_at = 0.0
+
+    def get(self, url: str) -> CachedPage:
+        """Returns the rendered page, from the cache when it is fresh or still valid."""
+        url = clean_url(url)
+        return self._single_flight(
+            ("page", normalize_url(url)), lambda: self._load_or_render(url)
+        )
+
+    def summary(self, url: str, key: str, summarize: Callable[[str], str]) -> str:
+        """Returns the summary of ``url`` made by ``summarize`` (identified by ``key``).
+
+        It is computed once per page version.
+        """
+        page = self.get(url)
+        if key in page.summaries:
+            self._count("summary_hits")
+            return page.summaries[key]
+
+        def compute() -> str:
+            text = summarize(page.html)
+            self._count("summaries")
+            latest = self._read(page.url)
+            # Keep the summaries other crews stored meanwhile for the same version.
+            if latest is not None and latest.fetched_at == page.fetched_at:
+                page.summaries.update(latest.summaries)
+            page.summaries[key] = text
+            self._write(page)
+            return text
+
+        return self._single_flight(
+            ("summary", f"{normalize_url(page.url)}#{key}"), compute
+        )
+
+    def _load_or_render(self, url: str) -> CachedPage:
+        page = self._read(url)
+        if page is not None:
+            if time.time() - page.fetched_at < self.ttl:
+                self._count("hits")
+                return page
+            if self._not_modified(page):
+                self._count("revalidated")
+                page.fetched_at = time.time()
+                self._write(page)
+                return page
+
+        html, headers = self.render(url)
+        self._count("renders")
+        page = CachedPage(url=url, html=html, fetched_at=time.time())
+        page.etag, page.last_modified = self._validators(url, headers)
+        self._write(page)
+        return page
+
+    def _validators(
+        self, url: str, headers: Dict[str, str]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        headers = {name.lower(): value for name, value in headers.items()}
+        if "etag" not in headers and "last-modified" not in headers:
+            # The renderer did not pass them on; ask the site itself.
+            try:
+                response = self.session.head(url, allow_redirects=True, timeout=10)
+                headers = {
+                    name.lower(): value for name, value in response.headers.items()
+                }
+            except requests.RequestException:
+                return None, None
+        return headers.get("etag"), headers.get("last-modified")
+
+    def _not_modified(self, page: CachedPage) -> bool:
+        conditions = {}
+        if page.etag:
+            conditions["If-None-Match"] = page.etag
+        if page.last_modified:
+            conditions["If-Modified-Since"] = page.last_modified
+        if not conditions:
+            return False
+        try:
+            with self.session.get(
+                page.url, headers=conditions, timeout=10, stream=True
+            ) as response:
+                return response.status_code == 304
+        except requests.RequestException:
+            return False
+
+    def _single_flight(self, key: Tuple[str, str], compute: Callable):
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.stats["coalesced"] += 1
+        if leader:
+            try:
+                future.set_result(compute())
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    del self._in_flight[key]
+        return future.result()
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / f"{digest}.json"
+
+    def _read(self, url: str) -> Optional[CachedPage]:
+        path = self._path(url)
+        try:
+            page = CachedPage(**json.loads(path.read_text(encoding="utf-8")))
+            # The modification time records the last use, for eviction.
+            os.utime(path)
+        except (OSError, ValueError, TypeError):
+            return None
+        return page
+
+    def _write(self, page: CachedPage) -> None:
+        path = self._path(page.url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(asdict(page)), encoding="utf-8")
+        os.replace(tmp, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        """Removes stale pages, then the least recently used ones beyond ``max_bytes``.
+
+        The cache directory is scanned at most once per ``EVICTION_INTERVAL``.
+        """
+        with self._lock:
+            now = time.time()
+            if now - self._evicted_at < EVICTION_INTERVAL:
+                return
+            self._evicted_at = now
+        entries = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for used_at, size, path in entries:
+            if now - used_at < self.max_age and total <= self.max_bytes:
+                break
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                continue
+            total -= size
+            self._count("evicted")
+
+
+PAGE_CACHE = PageCache()